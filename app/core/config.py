@@ -1,11 +1,14 @@
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from pathlib import Path
+from typing import Optional
 
 
 class Settings(BaseSettings):
     model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8")
 
     DATABASE_URL: str
+    # 비어 있으면 DATABASE_URL의 드라이버만 비동기 드라이버(aiomysql, aiosqlite)로 바꿔 쓴다.
+    ASYNC_DATABASE_URL: Optional[str] = None
     GEMINI_APIKEY: str
     BASE_PATH: Path
     SECRET_KEY: str
@@ -13,6 +16,29 @@ class Settings(BaseSettings):
     GOOGLE_CLIENT_SECRET: str
     GOOGLE_REDIRECT_URI: str
     FRONTEND_REDIRECT_URI: str
+    # 구글 OAuth 엔드포인트. 테스트나 스테이징에서는 대역 서버로 바꿀 수 있다.
+    GOOGLE_TOKEN_URL: str = "https://oauth2.googleapis.com/token"
+    GOOGLE_CERTS_URL: str = "https://www.googleapis.com/oauth2/v1/certs"
+    GOOGLE_HTTP_TIMEOUT_SEC: float = 10.0
+
+    # 리사이즈/WebP 변환 이미지 디스크 캐시
+    IMAGE_VARIANT_CACHE_PATH: Path = Path("cache/img_variants")
+    IMAGE_VARIANT_CACHE_MAX_MB: int = 1024
+    IMAGE_VARIANT_WORKERS: int = 2
+    # 회차별 이미지 묶음(zip) 메모리 캐시
+    IMAGE_BUNDLE_CACHE_MB: int = 256
+    # /results/save 쓰기 지연 버퍼. False면 요청마다 바로 커밋한다(테스트용 동기 모드).
+    RESULT_WRITE_BEHIND: bool = True
+    RESULT_BUFFER_FLUSH_SEC: float = 1.0
+    RESULT_BUFFER_FLUSH_ROWS: int = 200
+    RESULT_BUFFER_MAX_ROWS: int = 10000
+    # 토큰 subject별 사용자 캐시. 다른 프로세스에서 바꾼 사용자 정보는 TTL이 지나야 반영된다.
+    USER_CACHE_TTL_SEC: float = 60.0
+    USER_CACHE_MAX_USERS: int = 10000
+    # bcrypt 전용 스레드 풀. 대기 중인 해시/검증이 MAX_PENDING개를 넘으면 503으로 바로 거절한다.
+    PASSWORD_BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_PENDING: int = 32
 
 
 settings = Settings()
@@ -0,0 +1,42 @@
+from typing import Any, Dict, List
+from sqlalchemy import insert
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from ..models import Result, ResultSet
+
+
+async def insert_many_results(rows: List[Dict[str, Any]], db: AsyncSession):
+    # ORM 객체와 identity map을 거치지 않고 한 번의 executemany(여러 행 INSERT)로 쓴다.
+    if rows:
+        await db.exec(insert(Result), params=rows)
+    return len(rows)
+
+
+async def insert_results_returning_ids(
+    rows: List[Dict[str, Any]], db: AsyncSession
+) -> List[int]:
+    # id가 필요한 행(오답노트에 남길 틀린 풀이)만 넘긴다.
+    # RETURNING을 지원하면 한 번의 일괄 INSERT로, 아니면(MySQL) 같은 트랜잭션 안에서 한 행씩 쓴다.
+    if not rows:
+        return []
+    if db.get_bind().dialect.insert_executemany_returning_sort_by_parameter_order:
+        inserted = await db.exec(
+            insert(Result).returning(Result.id, sort_by_parameter_order=True),
+            params=rows,
+        )
+        return list(inserted.scalars())
+    return [
+        (await db.exec(insert(Result).values(**row))).inserted_primary_key[0]
+        for row in rows
+    ]
+
+
+async def read_one_result_to_hide(id: int, user_id: int, db: AsyncSession):
+    result_read = (
+        await db.exec(
+            select(Result)
+            .where(Result.id == id, Result.resultset.has(ResultSet.user_id == user_id))
+            .order_by(Result.id.desc())
+        )
+    ).first()
+    return result_read
@@ -0,0 +1,63 @@
+from typing import Any, Dict
+from sqlalchemy import delete, insert, update
+from sqlalchemy.orm import selectinload
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from ..models import GichulSubject, Result, ResultSet, ResultSetSubjectScore
+
+
+async def read_one_resultset(resultset_id: int, user_id: int, db: AsyncSession):
+    statement = select(ResultSet).where(
+        ResultSet.id == resultset_id, ResultSet.user_id == user_id
+    )
+    resultset_to_update = (await db.exec(statement)).one_or_none()
+    return resultset_to_update
+
+
+async def update_resultset_totals(resultset_id: int, db: AsyncSession, **values):
+    # 채점 결과(duration_sec, total_amount 등)를 ORM 변경 추적 없이 UPDATE 한 번으로 쓴다.
+    await db.exec(
+        update(ResultSet).where(ResultSet.id == resultset_id).values(**values)
+    )
+
+
+async def replace_subject_scores(
+    resultset_id: int,
+    subject_scores: Dict[GichulSubject, Dict[str, Any]],
+    db: AsyncSession,
+):
+    await db.exec(
+        delete(ResultSetSubjectScore).where(
+            ResultSetSubjectScore.resultset_id == resultset_id
+        )
+    )
+    await db.exec(
+        insert(ResultSetSubjectScore),
+        params=[
+            {
+                "resultset_id": resultset_id,
+                "subject": subject,
+                "question_counts": scores["question_counts"],
+                "correct_counts": scores["correct_counts"],
+                "passed": scores["passed"],
+            }
+            for subject, scores in subject_scores.items()
+        ],
+    )
+
+
+async def read_one_resultset_for_score(
+    resultset_id: int, user_id: int, db: AsyncSession
+):
+    # 비동기 세션에서는 지연 로딩을 할 수 없으므로 응답에 필요한 관계를 모두 미리 읽는다.
+    statement = (
+        select(ResultSet)
+        .where(
+            ResultSet.id == resultset_id,
+            ResultSet.user_id == user_id,
+            ResultSet.results.any(),
+        )
+        .options(selectinload(ResultSet.results).selectinload(Result.gichul_qna))
+    )
+    resultset_to_score = (await db.exec(statement)).one_or_none()
+    return resultset_to_score
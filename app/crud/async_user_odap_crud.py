@@ -0,0 +1,24 @@
+from typing import Sequence
+from sqlalchemy import update
+from sqlmodel.ext.asyncio.session import AsyncSession
+from ..models import Result, UserOdap
+from .user_odap_crud import _odap_rows, _upsert_statement
+
+
+async def record_wrong_results(
+    user_id: int, wrong_results: Sequence[Result], db: AsyncSession
+):
+    """
+    틀린 풀이를 오답노트에 반영한다. 한 번의 제출에 같은 문제가 여러 번 있으면 마지막 풀이를 남긴다.
+    """
+    rows = _odap_rows(user_id, wrong_results)
+    if rows:
+        await db.exec(_upsert_statement(db), params=rows)
+
+
+async def hide_odap(user_id: int, result_id: int, db: AsyncSession):
+    await db.exec(
+        update(UserOdap)
+        .where(UserOdap.user_id == user_id, UserOdap.result_id == result_id)
+        .values(hidden=True)
+    )
@@ -1,5 +1,6 @@
 from typing import Collection
 from sqlmodel import Session, select
+from sqlalchemy.orm import selectinload
 from ..models import GichulSet, GichulSetType, GichulSetGrade
 
 
@@ -19,3 +20,9 @@ def read_one_qna_set(gichulset_id: int, db: Session):
 
 def read_many_gichulset_by_ids(gichulset_ids: Collection[int], db: Session):
     return db.exec(select(GichulSet).where(GichulSet.id.in_(gichulset_ids))).all()
+
+
+def read_all_qna_sets_with_qnas(db: Session):
+    return db.exec(
+        select(GichulSet).options(selectinload(GichulSet.qnas)).order_by(GichulSet.id)
+    ).all()
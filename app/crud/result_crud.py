@@ -1,5 +1,6 @@
-from typing import Annotated, Optional, List
+from typing import Annotated, Any, Dict, Optional, List
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import insert
 from sqlmodel import Session, SQLModel, Field, select
 from sqlalchemy.orm import selectinload
 from ..schemas import UserSolvedQna, UserBase, ManyResults
@@ -12,15 +13,23 @@ def create_one_result(new_result: Result, db: Session):
     return new_result
 
 
-def create_many_results(resultlist: List[Result], db: Session):
-    db.add_all(resultlist)
-    return resultlist
+def insert_many_results(rows: List[Dict[str, Any]], db: Session):
+    # ORM 객체와 identity map을 거치지 않고 한 번의 executemany(여러 행 INSERT)로 쓴다.
+    if rows:
+        db.execute(insert(Result), rows)
+    return len(rows)
 
 
-def read_one_result_to_hide(id: int, user_id: int, db: Session):
-    result_read = db.exec(
-        select(Result)
-        .where(Result.id == id, Result.resultset.has(ResultSet.user_id == user_id))
-        .order_by(Result.id.desc())
-    ).first()
-    return result_read
+def insert_results_returning_ids(rows: List[Dict[str, Any]], db: Session) -> List[int]:
+    # id가 필요한 행(오답노트에 남길 틀린 풀이)만 넘긴다.
+    # RETURNING을 지원하면 한 번의 일괄 INSERT로, 아니면(MySQL) 같은 트랜잭션 안에서 한 행씩 쓴다.
+    if not rows:
+        return []
+    if db.get_bind().dialect.insert_executemany_returning_sort_by_parameter_order:
+        inserted = db.execute(
+            insert(Result).returning(Result.id, sort_by_parameter_order=True), rows
+        )
+        return list(inserted.scalars())
+    return [
+        db.execute(insert(Result).values(**row)).inserted_primary_key[0] for row in rows
+    ]
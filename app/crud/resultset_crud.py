@@ -1,9 +1,18 @@
-from typing import Annotated, Optional, List
+from typing import Annotated, Any, Collection, Dict, Optional, List
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import case, delete, func, insert, update
 from sqlmodel import Session, SQLModel, Field, select
 from sqlalchemy.orm import selectinload
 from ..schemas import UserSolvedQna, UserBase
-from ..models import User, ResultSet, ExamType, Result, GichulQna
+from ..models import (
+    User,
+    ResultSet,
+    ExamType,
+    Result,
+    GichulQna,
+    GichulSubject,
+    ResultSetSubjectScore,
+)
 from .user_crud import read_one_user
 
 
@@ -23,48 +32,107 @@ def read_one_resultset(resultset_id: int, user_id: int, db: Session):
     return resultset_to_update
 
 
-def read_many_resultsets(user_id: int, db: Session):
-    return db.exec(select(ResultSet).where(ResultSet.user_id == user_id)).all()
+def update_resultset_totals(resultset_id: int, db: Session, **values):
+    # 채점 결과(duration_sec, total_amount 등)를 ORM 변경 추적 없이 UPDATE 한 번으로 쓴다.
+    db.execute(update(ResultSet).where(ResultSet.id == resultset_id).values(**values))
 
 
-def read_mypage_odaps_in_resultsets(user_id: int, db: Session):
+def replace_subject_scores(
+    resultset_id: int,
+    subject_scores: Dict[GichulSubject, Dict[str, Any]],
+    db: Session,
+):
+    db.execute(
+        delete(ResultSetSubjectScore).where(
+            ResultSetSubjectScore.resultset_id == resultset_id
+        )
+    )
+    db.execute(
+        insert(ResultSetSubjectScore),
+        [
+            {
+                "resultset_id": resultset_id,
+                "subject": subject,
+                "question_counts": scores["question_counts"],
+                "correct_counts": scores["correct_counts"],
+                "passed": scores["passed"],
+            }
+            for subject, scores in subject_scores.items()
+        ],
+    )
+
+
+def read_scored_resultsets(
+    examtype: ExamType,
+    user_id: int,
+    db: Session,
+    before_id: Optional[int] = None,
+    limit: Optional[int] = None,
+):
     statement = (
         select(ResultSet)
         .where(
-            ResultSet.user_id == user_id, ResultSet.results.any(Result.hidden == False)
-        )
-        .options(
-            selectinload(ResultSet.results)
-            .selectinload(Result.gichul_qna)
-            .selectinload(GichulQna.gichulset)
+            ResultSet.user_id == user_id,
+            ResultSet.examtype == examtype,
+            ResultSet.gichulset_id != None,
         )
         .order_by(ResultSet.id.desc())
     )
-    odap_sets = db.exec(statement).all()
-    return odap_sets
+    if before_id is not None:
+        statement = statement.where(ResultSet.id < before_id)
+    if limit is not None:
+        statement = statement.limit(limit)
+    return db.exec(statement).all()
 
 
-def read_one_resultset_for_score(resultset_id: int, user_id: int, db: Session):
+def read_subject_scores(resultset_ids: Collection[int], db: Session):
+    statement = select(ResultSetSubjectScore).where(
+        ResultSetSubjectScore.resultset_id.in_(resultset_ids)
+    )
+    return db.exec(statement).all()
+
+
+def read_subject_counts(resultset_ids: Collection[int], db: Session):
+    """
+    세션별·과목별 (resultset_id, subject, 문제 수, 맞힌 수, 회차 id)를 GROUP BY로 센다.
+    과목은 세션 안에서 처음 풀이한 순서로 정렬한다.
+    """
     statement = (
-        select(ResultSet)
-        .where(
-            ResultSet.id == resultset_id,
-            ResultSet.user_id == user_id,
-            ResultSet.results.any(),
+        select(
+            Result.resultset_id,
+            GichulQna.subject,
+            func.count(Result.id),
+            func.sum(case((Result.correct == True, 1), else_=0)),
+            func.min(GichulQna.gichulset_id),
         )
-        .options(selectinload(ResultSet.results).selectinload(Result.gichul_qna))
+        .join(GichulQna, Result.gichulqna_id == GichulQna.id)
+        .where(Result.resultset_id.in_(resultset_ids))
+        .group_by(Result.resultset_id, GichulQna.subject)
+        .order_by(Result.resultset_id, func.min(Result.id))
     )
-    resultset_to_score = db.exec(statement).one_or_none()
-    return resultset_to_score
+    return db.exec(statement).all()
 
 
-def read_many_resultsets_with_results_for_score(
-    examtype: ExamType, user_id: int, db: Session
+def read_unscored_resultsets_for_score(
+    db: Session,
+    examtype: Optional[ExamType] = None,
+    user_id: Optional[int] = None,
+    limit: Optional[int] = None,
 ):
+    # resultset_subject_score가 생기기 전에 채점된(또는 채점되지 않은) 결과가 있는 세션
     statement = (
         select(ResultSet)
-        .where(ResultSet.user_id == user_id, ResultSet.examtype == examtype)
-        .options(selectinload(ResultSet.results).selectinload(Result.gichul_qna))
+        .where(ResultSet.gichulset_id == None, ResultSet.results.any())
+        .order_by(ResultSet.id)
     )
-    resultsets_to_score = db.exec(statement).all()
-    return resultsets_to_score
+    if examtype is not None:
+        statement = statement.where(ResultSet.examtype == examtype)
+    if user_id is not None:
+        statement = statement.where(ResultSet.user_id == user_id)
+    if limit is not None:
+        statement = statement.limit(limit)
+    return db.exec(statement).all()
+
+
+def read_many_resultsets(user_id: int, db: Session):
+    return db.exec(select(ResultSet).where(ResultSet.user_id == user_id)).all()
@@ -0,0 +1,117 @@
+from typing import Dict, List, Optional, Sequence
+from sqlalchemy import delete, false, func, insert
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlmodel import Session, select
+from ..models import Result, ResultSet, UserOdap
+
+
+def _upsert_statement(db: Session):
+    # (user_id, gichulqna_id)가 이미 있으면 최근 오답으로 바꾸고 시도 횟수를 더한다.
+    dialect = db.get_bind().dialect.name
+    if dialect == "mysql":
+        statement = mysql_insert(UserOdap)
+        return statement.on_duplicate_key_update(
+            result_id=statement.inserted.result_id,
+            choice=statement.inserted.choice,
+            attempt_counts=UserOdap.attempt_counts + statement.inserted.attempt_counts,
+            hidden=False,
+        )
+    statement = sqlite_insert(UserOdap)
+    return statement.on_conflict_do_update(
+        index_elements=[UserOdap.user_id, UserOdap.gichulqna_id],
+        set_={
+            "result_id": statement.excluded.result_id,
+            "choice": statement.excluded.choice,
+            "attempt_counts": UserOdap.attempt_counts
+            + statement.excluded.attempt_counts,
+            "hidden": False,
+        },
+    )
+
+
+def _odap_rows(user_id: int, wrong_results: Sequence[Result]) -> List[Dict]:
+    rows: Dict[int, Dict] = {}
+    for result in sorted(wrong_results, key=lambda r: r.id):
+        row = rows.get(result.gichulqna_id)
+        rows[result.gichulqna_id] = {
+            "user_id": user_id,
+            "gichulqna_id": result.gichulqna_id,
+            "result_id": result.id,
+            "choice": result.choice,
+            "attempt_counts": row["attempt_counts"] + 1 if row else 1,
+            "hidden": False,
+        }
+    return list(rows.values())
+
+
+def record_wrong_results(user_id: int, wrong_results: Sequence[Result], db: Session):
+    """
+    틀린 풀이를 오답노트에 반영한다. 한 번의 제출에 같은 문제가 여러 번 있으면 마지막 풀이를 남긴다.
+    """
+    rows = _odap_rows(user_id, wrong_results)
+    if rows:
+        db.execute(_upsert_statement(db), rows)
+
+
+def read_user_odaps(
+    user_id: int,
+    db: Session,
+    before_result_id: Optional[int] = None,
+    limit: Optional[int] = None,
+) -> List[UserOdap]:
+    statement = (
+        select(UserOdap)
+        .where(UserOdap.user_id == user_id, UserOdap.hidden == False)
+        .order_by(UserOdap.result_id.desc())
+    )
+    if before_result_id is not None:
+        statement = statement.where(UserOdap.result_id < before_result_id)
+    if limit is not None:
+        statement = statement.limit(limit)
+    return db.exec(statement).all()
+
+
+def rebuild_user_odaps(db: Session) -> int:
+    """
+    result 테이블로부터 user_odap 전체를 다시 만든다. scripts/backfillodaps.py가 사용한다.
+    """
+    latest = (
+        select(
+            ResultSet.user_id,
+            Result.gichulqna_id,
+            func.max(Result.id).label("result_id"),
+            func.count(Result.id).label("attempt_counts"),
+        )
+        .join(ResultSet, Result.resultset_id == ResultSet.id)
+        .where(
+            ResultSet.user_id != None,
+            Result.hidden == False,
+            Result.correct == False,
+            Result.choice != None,
+        )
+        .group_by(ResultSet.user_id, Result.gichulqna_id)
+        .subquery()
+    )
+    db.execute(delete(UserOdap))
+    db.execute(
+        insert(UserOdap).from_select(
+            [
+                "user_id",
+                "gichulqna_id",
+                "result_id",
+                "choice",
+                "attempt_counts",
+                "hidden",
+            ],
+            select(
+                latest.c.user_id,
+                latest.c.gichulqna_id,
+                latest.c.result_id,
+                Result.choice,
+                latest.c.attempt_counts,
+                false(),
+            ).join(Result, Result.id == latest.c.result_id),
+        )
+    )
+    return db.exec(select(func.count()).select_from(UserOdap)).one()
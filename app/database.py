@@ -1,10 +1,32 @@
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine
 from sqlmodel import create_engine, Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 from .core.config import settings
 
+# 동기 URL의 백엔드별 비동기 드라이버
+ASYNC_DRIVERS = {"mysql": "aiomysql", "sqlite": "aiosqlite"}
+
+
+def async_database_url(url: str) -> str:
+    parsed = make_url(url)
+    driver = ASYNC_DRIVERS.get(parsed.get_backend_name())
+    if driver is None:
+        return url
+    return parsed.set(
+        drivername=f"{parsed.get_backend_name()}+{driver}"
+    ).render_as_string(hide_password=False)
+
 
 # SQLAlchemy 엔진
 mysql_url = settings.DATABASE_URL
 engine = create_engine(mysql_url, echo=True, isolation_level="READ COMMITTED")
+# 비동기 엔진. 라우터를 하나씩 get_async_db로 옮기는 동안 두 엔진을 함께 쓴다.
+async_engine = create_async_engine(
+    settings.ASYNC_DATABASE_URL or async_database_url(mysql_url),
+    echo=True,
+    isolation_level="READ COMMITTED",
+)
 
 
 def get_db():
@@ -13,3 +35,9 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    # 커밋 뒤에 응답을 만들면서 속성을 읽어도 다시 조회(지연 로딩)하지 않도록 만료시키지 않는다.
+    async with AsyncSession(async_engine, expire_on_commit=False) as db:
+        yield db
@@ -8,7 +8,7 @@ from .database import get_db
 from .models import User, UserBase
 from .schemas import TokenData
 from .core.security import SECRET_KEY, ALGORITHM
-from .crud.user_crud import read_one_user
+from .utils.user_cache import user_cache
 
 
 oauth2_scheme_strict = OAuth2PasswordBearer(tokenUrl="api/auth/token")
@@ -31,10 +31,10 @@ async def get_current_user(
         username = payload.get("sub")
         if username is None:
             raise credentials_exception
-        token_data = TokenData(username=username)
+        token_data = TokenData(username=username, uid=payload.get("uid"))
     except InvalidTokenError:
         raise credentials_exception
-    user = read_one_user(token_data.username, db)
+    user = user_cache.get(token_data.username, token_data.uid, db)
     if user is None:
         raise credentials_exception
     return user
@@ -66,11 +66,11 @@ async def get_optional_current_user(
         username = payload.get("sub")
         if username is None:
             return None
-        token_data = TokenData(username=username)
+        token_data = TokenData(username=username, uid=payload.get("uid"))
     except InvalidTokenError:
         raise credentials_exception
     assert token_data.username is not None
-    user = read_one_user(token_data.username, db)
+    user = user_cache.get(token_data.username, token_data.uid, db)
     if user is None:
         raise credentials_exception
     return user
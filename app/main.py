@@ -1,4 +1,5 @@
 import logging
+from contextlib import asynccontextmanager
 from logging.config import dictConfig
 import time
 from fastapi import FastAPI, Request
@@ -6,12 +7,42 @@ from fastapi.responses import HTMLResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from fastapi.middleware.cors import CORSMiddleware
-from .routers import auth, result, solve, modelcall, cbt, mypage, page
+from sqlmodel import Session
+from sqlalchemy.exc import SQLAlchemyError
+from .routers import auth, result, solve, modelcall, cbt, mypage, page, search
 from .core.logger import LOGGING_CONFIG
+from .database import async_engine, engine
+from .services import question_bank
+from .services.result_buffer import result_buffer
+from .utils.image_manifest import image_manifest
+from .utils.google_oauth import google_oauth
+from .utils.image_variants import image_variants
+from .utils.password_hasher import password_hasher
 
 dictConfig(LOGGING_CONFIG)
 
-app = FastAPI()
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    image_manifest.build()
+    if not question_bank.is_question_bank_loaded():
+        try:
+            with Session(engine) as db:
+                question_bank.load_question_bank(db)
+        except SQLAlchemyError:
+            # 시작 시 읽지 못하면 첫 요청에서 다시 시도한다.
+            logger.exception("failed to warm up the question bank")
+    yield
+    result_buffer.close()
+    image_variants.shutdown()
+    password_hasher.shutdown()
+    await google_oauth.aclose()
+    await async_engine.dispose()
+
+
+app = FastAPI(lifespan=lifespan)
 
 # app.mount("/static", StaticFiles(directory="app/static"), name="static")
 # templates = Jinja2Templates(directory="app/templates")
@@ -22,10 +53,9 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],  # 마이페이지 다음 페이지 커서
 )
 
-logger = logging.getLogger(__name__)
-
 
 @app.middleware("http")
 async def log_requests(request: Request, call_next):
@@ -46,6 +76,7 @@ app.include_router(modelcall.router, prefix="/api")
 app.include_router(cbt.router, prefix="/api")
 app.include_router(result.router, prefix="/api")
 app.include_router(mypage.router, prefix="/api")
+app.include_router(search.router, prefix="/api")
 # app.include_router(page.router)
 
 
@@ -11,7 +11,15 @@ from sqlmodel import (
 )
 from pydantic import EmailStr
 from sqlalchemy.sql import func
-from sqlalchemy import Column, Enum as SQLAlchemyEnum, Text
+from sqlalchemy import (
+    Column,
+    Enum as SQLAlchemyEnum,
+    Text,
+    BigInteger,
+    LargeBinary,
+    Index,
+    UniqueConstraint,
+)
 
 # Enum 정의
 
@@ -80,7 +88,9 @@ class DBUser(UserBase):
         default=None, max_length=60, description="only for traditional sign-in"
     )
     google_sub: Optional[str] = Field(
-        default=None, description="unique subject identifier from Google OAuth"
+        default=None,
+        index=True,
+        description="unique subject identifier from Google OAuth",
     )
     profile_img_url: Optional[str] = Field(
         default=None, description="typically given from Google account"
@@ -101,6 +111,10 @@ class GichulSet(SQLModel, table=True):
     """기출문제 세트 정보 테이블"""
 
     __tablename__: ClassVar[str] = "gichulset"
+    __table_args__ = (
+        # 회차 조회 키. 한 회차는 한 번만 들어가야 한다.
+        UniqueConstraint("type", "grade", "year", "inning", name="uq_gichulset_inning"),
+    )
 
     id: Optional[int] = Field(default=None, primary_key=True)
     type: GichulSetType = Field(
@@ -191,6 +205,12 @@ class GichulQna(GichulQnaBase, table=True):
 
     __tablename__: ClassVar[str] = "gichulqna"
 
+    cluster_id: Optional[int] = Field(
+        default=None,
+        index=True,
+        description="near-duplicate cluster from scripts/clusterdups.py (smallest qna id)",
+    )
+
     gichulset: Optional[GichulSet] = Relationship(back_populates="qnas")
     results: List["Result"] = Relationship(back_populates="gichul_qna")
 
@@ -199,6 +219,10 @@ class ResultSet(SQLModel, table=True):
     """모의 시험 결과 정보"""
 
     __tablename__: ClassVar[str] = "resultset"
+    __table_args__ = (
+        # 마이페이지: 사용자·시험 종류별 세션을 id 순으로 페이지네이션
+        Index("ix_resultset_user_examtype_id", "user_id", "examtype", "id"),
+    )
 
     id: Optional[int] = Field(default=None, primary_key=True)
     examtype: ExamType = Field(
@@ -220,6 +244,21 @@ class ResultSet(SQLModel, table=True):
     passed: bool = Field(
         default=False, description="whether the user would have passed the exam"
     )
+    cbt_seed: Optional[int] = Field(
+        default=None,
+        sa_column=Column(BigInteger, nullable=True),
+        description="seed used to draw a cbt session",
+    )
+    question_manifest: Optional[bytes] = Field(
+        default=None,
+        sa_column=Column(LargeBinary, nullable=True),
+        description="packed uint32 gichulqna ids drawn for a cbt session",
+    )
+    gichulset_id: Optional[int] = Field(
+        default=None,
+        foreign_key="gichulset.id",
+        description="gichulset the session was scored against; set with resultset_subject_score rows",
+    )
 
     user: Optional[User] = Relationship(back_populates="resultsets")
     results: List["Result"] = Relationship(back_populates="resultset")
@@ -229,6 +268,7 @@ class Result(SQLModel, table=True):
     """사용자의 문제 풀이 테이블"""
 
     __tablename__: ClassVar[str] = "result"
+    __table_args__ = (Index("ix_result_resultset_hidden", "resultset_id", "hidden"),)
 
     id: Optional[int] = Field(default=None, primary_key=True)
     choice: Optional[ExamChoice] = Field(
@@ -248,3 +288,48 @@ class Result(SQLModel, table=True):
 
     gichul_qna: Optional[GichulQna] = Relationship(back_populates="results")
     resultset: Optional[ResultSet] = Relationship(back_populates="results")
+
+
+class ResultSetSubjectScore(SQLModel, table=True):
+    """채점이 끝난 시험의 과목별 점수. 제출할 때 한 번 기록하고 마이페이지는 이것만 읽는다."""
+
+    __tablename__: ClassVar[str] = "resultset_subject_score"
+
+    resultset_id: int = Field(foreign_key="resultset.id", primary_key=True)
+    subject: GichulSubject = Field(
+        sa_column=Column(
+            SQLAlchemyEnum(
+                GichulSubject, values_callable=lambda x: [e.value for e in x]
+            ),
+            primary_key=True,
+        )
+    )
+    question_counts: int = Field(default=0)
+    correct_counts: int = Field(default=0)
+    passed: bool = Field(default=False)
+
+
+class UserOdap(SQLModel, table=True):
+    """사용자별 오답노트. 풀이를 저장하거나 숨길 때 같은 트랜잭션에서 갱신한다."""
+
+    __tablename__: ClassVar[str] = "user_odap"
+    __table_args__ = (
+        # 마이페이지 오답노트: 숨기지 않은 것을 최근 오답 순으로 키셋 페이지네이션
+        Index("ix_user_odap_user_hidden_result", "user_id", "hidden", "result_id"),
+    )
+
+    user_id: int = Field(foreign_key="user.id", primary_key=True)
+    gichulqna_id: int = Field(foreign_key="gichulqna.id", primary_key=True)
+    result_id: int = Field(
+        foreign_key="result.id", description="the latest wrong result"
+    )
+    choice: Optional[ExamChoice] = Field(
+        default=None,
+        sa_column=Column(
+            SQLAlchemyEnum(ExamChoice, values_callable=lambda x: [e.value for e in x]),
+            nullable=True,
+        ),
+        description="choice of the latest wrong result",
+    )
+    attempt_counts: int = Field(default=1, description="number of wrong attempts")
+    hidden: bool = Field(default=False)
@@ -1,5 +1,5 @@
-import requests
-from typing import Annotated, Union
+import httpx
+from typing import Annotated
 from fastapi import APIRouter, Depends, Request, HTTPException, Query
 from fastapi.responses import RedirectResponse
 from fastapi.security import OAuth2PasswordRequestForm
@@ -8,6 +8,7 @@ from ..core.config import settings
 from ..database import get_db
 from ..models import User
 from ..services.user import register_one_user, sign_user_in, sign_google_user
+from ..utils.google_oauth import google_oauth
 from ..dependencies import get_current_active_user
 from ..schemas import CreateUser, CreateUserResponse, Token, SignMeResponse
 
@@ -17,7 +18,6 @@ router = APIRouter(prefix="/auth", tags=["Authentication"])
 
 google_redirect_uri = settings.GOOGLE_REDIRECT_URI
 google_client_id = settings.GOOGLE_CLIENT_ID
-google_client_secret = settings.GOOGLE_CLIENT_SECRET
 frontend_redirect_uri = settings.FRONTEND_REDIRECT_URI
 
 
@@ -26,7 +26,7 @@ async def user_signup(
     user_in: CreateUser,
     db: Annotated[Session, Depends(get_db)],
 ):
-    return register_one_user(user_in, db)
+    return await register_one_user(user_in, db)
 
 
 @router.post("/token", response_model=Token)
@@ -34,7 +34,7 @@ async def sign_user_in_for_access_token(
     form_data: Annotated[OAuth2PasswordRequestForm, Depends()],
     db: Annotated[Session, Depends(get_db)],
 ):
-    return sign_user_in(form_data, db)
+    return await sign_user_in(form_data, db)
 
 
 @router.get("/sign/me", response_model=SignMeResponse)
@@ -55,30 +55,13 @@ async def login_google():
     )
 
 
-def google_get_token(code: str) -> Union[str, bytes]:
-    token_url = "https://oauth2.googleapis.com/token"
-    data = {
-        "code": code,
-        "client_id": google_client_id,
-        "client_secret": google_client_secret,
-        "redirect_uri": google_redirect_uri,
-        "grant_type": "authorization_code",
-    }
-    response = requests.post(token_url, data=data)
-    token_data = response.json()
-
-    if "id_token" not in token_data:
-        raise HTTPException(
-            status_code=400, detail="ID token not found in response from Google"
-        )
-
-    return token_data["id_token"]
-
-
 @router.get("/sign/google")
 async def auth_google_callback(code: str, db: Annotated[Session, Depends(get_db)]):
-    id_token_jwt = google_get_token(code)
-    access_token = sign_google_user(id_token_jwt, db)
+    try:
+        id_token_jwt = await google_oauth.exchange_code(code)
+    except httpx.HTTPError:
+        raise HTTPException(status_code=502, detail="Failed to reach Google")
+    access_token = await sign_google_user(id_token_jwt, db)
     return RedirectResponse(
         f"{frontend_redirect_uri}/auth/sign/google?token={access_token}"
     )
@@ -1,35 +1,69 @@
-from typing import Annotated, List
-from fastapi import APIRouter, Depends
+from typing import Annotated, List, Optional
+from fastapi import APIRouter, Depends, Query, Response
 from sqlmodel import Session
 from ..models import User
 from ..schemas import ResultSetWithResult
 from ..database import get_db
 from ..dependencies import get_current_active_user
-from ..services.result import retrieve_mypage_odaps, retrieve_session_resultsets
+from ..services.result import (
+    MYPAGE_PAGE_SIZE,
+    MYPAGE_PAGE_SIZE_MAX,
+    retrieve_mypage_odaps,
+    retrieve_session_resultsets,
+)
 
 
 router = APIRouter(prefix="/mypage", tags=["Pull information for my page"])
 
+# 응답 본문은 예전처럼 목록이고, 다음 페이지 커서는 헤더로 준다. 마지막 페이지면 헤더가 없다.
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+PageSize = Annotated[int, Query(ge=1, le=MYPAGE_PAGE_SIZE_MAX)]
+
+
+def _set_next_cursor(response: Response, next_cursor: Optional[str]):
+    if next_cursor is not None:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+
 
 @router.get("/odaps")
 def get_mypage_odaps(
+    response: Response,
     current_user: Annotated[User, Depends(get_current_active_user)],
     db: Annotated[Session, Depends(get_db)],
+    cursor: Optional[str] = None,
+    limit: PageSize = MYPAGE_PAGE_SIZE,
 ):
-    return retrieve_mypage_odaps(current_user, db)
+    odaps, next_cursor = retrieve_mypage_odaps(current_user, db, cursor, limit)
+    _set_next_cursor(response, next_cursor)
+    return odaps
 
 
 @router.get("/cbt_results")
 def get_mypage_cbt_results(
+    response: Response,
     current_user: Annotated[User, Depends(get_current_active_user)],
     db: Annotated[Session, Depends(get_db)],
+    cursor: Optional[str] = None,
+    limit: PageSize = MYPAGE_PAGE_SIZE,
 ):
-    return retrieve_session_resultsets(current_user, db, is_cbt=True)
+    sessions, next_cursor = retrieve_session_resultsets(
+        current_user, db, True, cursor, limit
+    )
+    _set_next_cursor(response, next_cursor)
+    return sessions
 
 
 @router.get("/exam_results")
 def get_mypage_exam_results(
+    response: Response,
     current_user: Annotated[User, Depends(get_current_active_user)],
     db: Annotated[Session, Depends(get_db)],
+    cursor: Optional[str] = None,
+    limit: PageSize = MYPAGE_PAGE_SIZE,
 ):
-    return retrieve_session_resultsets(current_user, db, is_cbt=False)
+    sessions, next_cursor = retrieve_session_resultsets(
+        current_user, db, False, cursor, limit
+    )
+    _set_next_cursor(response, next_cursor)
+    return sessions
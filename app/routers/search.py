@@ -0,0 +1,27 @@
+from typing import Annotated, List
+from fastapi import APIRouter, Depends, Query
+from sqlmodel import Session
+from ..database import get_db
+from ..schemas import SearchResult, SimilarQna
+from ..services.question_bank import SIMILAR_TOP_K
+from ..services.search import search_qnas, retrieve_similar_qnas
+
+router = APIRouter(prefix="/search", tags=["Search Gichul QnAs"])
+
+
+@router.get("/", response_model=List[SearchResult])
+def get_search_results(
+    q: Annotated[str, Query(min_length=2, max_length=200)],
+    db: Annotated[Session, Depends(get_db)],
+    limit: Annotated[int, Query(ge=1, le=50)] = 20,
+):
+    return search_qnas(q, limit, db)
+
+
+@router.get("/similar/{gichulqna_id}", response_model=List[SimilarQna])
+def get_similar_qnas(
+    gichulqna_id: int,
+    db: Annotated[Session, Depends(get_db)],
+    limit: Annotated[int, Query(ge=1, le=SIMILAR_TOP_K)] = SIMILAR_TOP_K,
+):
+    return retrieve_similar_qnas(gichulqna_id, limit, db)
@@ -1,14 +1,17 @@
 import logging
 from typing import Annotated, Literal, Optional
-from fastapi import APIRouter, Depends, status, HTTPException
+from fastapi import APIRouter, Depends, Header, Query
 from fastapi.responses import FileResponse
 from sqlmodel import Session
 from ..dependencies import get_optional_current_activate_user
-from ..core.config import settings
 from ..database import get_db
 from ..schemas import SolveResponse
 from ..models import GichulSetType, GichulSetInning, GichulSetGrade, ExamType, User
-from ..services.solve import retrieve_one_inning
+from ..services.solve import (
+    retrieve_one_inning,
+    serve_one_image,
+    serve_inning_image_bundle,
+)
 
 router = APIRouter(prefix="/solve", tags=["Provide Gichul QnAs"])
 
@@ -26,22 +29,29 @@ def get_one_inning(
     current_user: Annotated[
         Optional[User], Depends(get_optional_current_activate_user)
     ],
+    if_none_match: Annotated[Optional[str], Header()] = None,
+    answers: Annotated[bool, Query()] = True,
 ):
-    return retrieve_one_inning(examtype, year, license, level, round, db, current_user)
+    # answers=false면 정답과 해설을 비운 문제를 준다. 채점은 서버에서 한다.
+    return retrieve_one_inning(
+        examtype, year, license, level, round, db, current_user, if_none_match, answers
+    )
+
+
+@router.get("/img_bundle/{gichulset_id}")
+def get_inning_image_bundle(
+    gichulset_id: int,
+    db: Annotated[Session, Depends(get_db)],
+    if_none_match: Annotated[Optional[str], Header()] = None,
+):
+    return serve_inning_image_bundle(gichulset_id, db, if_none_match)
 
 
 @router.get("/img/{endpath:path}", response_class=FileResponse)
-def get_one_image(endpath: str):
-    base_path = settings.BASE_PATH
-    path = (base_path / endpath).resolve()
-    if not str(path).startswith(str(base_path.resolve())):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="접근이 허용되지 않은 경로입니다.",
-        )
-    if not path.is_file():
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="이미지를 찾을 수 없습니다.",
-        )
-    return FileResponse(path=path, media_type="image/png")
+def get_one_image(
+    endpath: str,
+    width: Annotated[Optional[int], Query(gt=0, le=4096)] = None,
+    fmt: Annotated[Literal["png", "webp"], Query(alias="format")] = "png",
+    if_none_match: Annotated[Optional[str], Header()] = None,
+):
+    return serve_one_image(endpath, if_none_match, width, fmt)
@@ -31,13 +31,22 @@ class SolveResponse(BaseModel):
     qnas: List[QnaWithImgPaths]
 
 
+# search
+class SearchResult(QnaWithImgPaths):
+    score: float
+
+
+class SimilarQna(QnaWithImgPaths):
+    similarity: float
+
+
 # cbt
 class CBTWithImgPaths(BaseModel):
     qnum: int
     subject: str
     ex1str: str
     ex3str: str
-    answer: str
+    answer: Optional[str] = None
     gichulset_id: int
     id: int
     questionstr: str
@@ -49,6 +58,7 @@ class CBTWithImgPaths(BaseModel):
 
 class CBTResponse(BaseModel):
     odapset_id: Optional[int] = None
+    seed: Optional[int] = None
     subjects: Dict[str, List[CBTWithImgPaths]]
 
 
@@ -76,6 +86,7 @@ class Token(BaseModel):
 
 class TokenData(BaseModel):
     username: Optional[str] = None
+    uid: Optional[int] = None
 
 
 # result
@@ -89,23 +100,25 @@ StrippedExamChoice = Annotated[ExamChoice, BeforeValidator(strip_if_str)]
 # space가 삽입될 수 있는 Enum 타입에 대해 Enum 유효성 검사 전 str 공백 제거
 
 
+# 채점은 서버의 정답표로 한다. answer는 예전 클라이언트와의 호환을 위해 받기만 하고 쓰지 않는다.
 class UserSolvedQna(BaseModel):
     choice: StrippedExamChoice
     gichulqna_id: int
-    answer: StrippedExamChoice
+    answer: Optional[StrippedExamChoice] = None
     odapset_id: int
 
 
 class OneResult(BaseModel):
     choice: Optional[StrippedExamChoice] = None
-    answer: StrippedExamChoice
+    answer: Optional[StrippedExamChoice] = None
     gichulqna_id: int
 
 
 class ManyResults(BaseModel):
     odapset_id: int
     duration_sec: Optional[int]
-    results: List[OneResult]
+    # 빈 제출은 채점할 회차를 알 수 없으므로 받지 않는다.
+    results: List[OneResult] = Field(min_length=1)
 
 
 class ResultsGot(BaseModel):
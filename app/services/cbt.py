@@ -0,0 +1,91 @@
+import random
+import secrets
+from typing import Dict, List, Optional, Sequence
+from sqlmodel import Session
+from fastapi import HTTPException
+from ..models import (
+    ExamType,
+    ResultSet,
+    User,
+    GichulSetGrade,
+    GichulSetType,
+    GichulSubject,
+)
+from ..schemas import CBTResponse
+from ..crud import resultset_crud
+from ..utils import cbt_utils
+from .question_bank import QuestionBank, get_question_bank
+
+QNAS_PER_SUBJECT = 25
+
+
+def _group_by_subject(
+    bank: QuestionBank, qna_ids: Sequence[int], answers: bool = True
+) -> Dict[GichulSubject, List[Dict]]:
+    # 해설에도 정답이 드러나므로 answers=False면 함께 비운다.
+    hidden = {} if answers else {"answer": None, "explanation": None}
+    random_set: Dict[GichulSubject, List[Dict]] = {}
+    for qna_id in qna_ids:
+        qna = bank.qnas[qna_id]
+        subject_qnas = random_set.setdefault(qna.subject, [])
+        subject_qnas.append(
+            {**qna.model_dump(), **hidden, "qnum": len(subject_qnas) + 1}
+        )
+    return random_set
+
+
+def draw_random_qna_set(
+    license: GichulSetType,
+    level: GichulSetGrade,
+    subjects: List[GichulSubject],
+    seed: Optional[int],
+    db: Session,
+    current_user: Optional[User],
+    answers: bool = True,
+) -> CBTResponse:
+    if seed is None:
+        seed = secrets.randbits(53)
+    rng = random.Random(seed)
+    bank = get_question_bank(db)
+    drawn_ids: List[int] = []
+    for subject in subjects:
+        pool = bank.get_cbt_pool(license, level, subject)
+        if len(pool) < QNAS_PER_SUBJECT:
+            raise HTTPException(status_code=404, detail="과목을 잘못 선택하셨습니다.")
+        drawn_ids.extend(rng.sample(pool, QNAS_PER_SUBJECT))
+    random_set = _group_by_subject(bank, drawn_ids, answers)
+
+    if current_user is None:
+        return CBTResponse(seed=seed, subjects=random_set)
+
+    new_resultset = ResultSet(
+        examtype=ExamType.cbt,
+        user_id=current_user.id,
+        cbt_seed=seed,
+        question_manifest=cbt_utils.pack_qna_ids(drawn_ids),
+    )
+    db.add(new_resultset)
+    db.commit()
+    db.refresh(new_resultset)
+    return CBTResponse(odapset_id=new_resultset.id, seed=seed, subjects=random_set)
+
+
+def rehydrate_qna_set(
+    odapset_id: int, db: Session, current_user: User, answers: bool = True
+) -> CBTResponse:
+    resultset = resultset_crud.read_one_resultset(odapset_id, current_user.id, db)
+    if resultset is None or resultset.question_manifest is None:
+        raise HTTPException(
+            status_code=404, detail=f"CBT with odapset_id = {odapset_id} not found"
+        )
+    bank = get_question_bank(db)
+    qna_ids = cbt_utils.unpack_qna_ids(resultset.question_manifest)
+    if any(qna_id not in bank.qnas for qna_id in qna_ids):
+        raise HTTPException(
+            status_code=404, detail="CBT questions are no longer in the question bank"
+        )
+    return CBTResponse(
+        odapset_id=resultset.id,
+        seed=resultset.cbt_seed,
+        subjects=_group_by_subject(bank, qna_ids, answers),
+    )
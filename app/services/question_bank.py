@@ -0,0 +1,359 @@
+import hashlib
+import logging
+import re
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+from pydantic import BaseModel, ConfigDict, TypeAdapter
+from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+from ..core.config import settings
+from ..crud import gichulset_crud
+from ..models import GichulSetType, GichulSetGrade, GichulSetInning, GichulSubject
+from ..schemas import QnaWithImgPaths
+from ..utils import solve_utils
+from ..utils.result_utils import AnswerKey
+from ..utils.image_manifest import image_manifest
+from ..utils.search_utils import NgramIndex, qna_search_text, tfidf_neighbors
+
+logger = logging.getLogger(__name__)
+
+# scripts/jsonImport.py가 임포트를 마치면 이 파일의 mtime을 갱신한다.
+# 각 워커는 STAMP_CHECK_INTERVAL_SEC마다 mtime을 확인해 바뀌었으면 뱅크를 다시 만든다.
+BANK_STAMP_NAME = ".question_bank_stamp"
+STAMP_CHECK_INTERVAL_SEC = 5.0
+# 문제마다 미리 계산해 두는 유사 문제 수
+SIMILAR_TOP_K = 10
+
+InningKey = Tuple[int, GichulSetType, GichulSetGrade, GichulSetInning]
+PoolKey = Tuple[GichulSetType, GichulSetGrade, GichulSubject]
+
+_qnas_adapter = TypeAdapter(Tuple[QnaWithImgPaths, ...])
+
+
+class BankSet(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
+    id: int
+    type: GichulSetType
+    grade: GichulSetGrade
+    year: int
+    inning: GichulSetInning
+    qnas: Tuple[QnaWithImgPaths, ...]
+    # /solve 응답의 qnas 부분을 미리 직렬화한 JSON과 그 해시로 만든 ETag
+    qnas_json: bytes
+    etag: str
+    # 정답과 해설을 null로 비운 시험용 JSON과 ETag
+    answerless_qnas_json: bytes
+    answerless_etag: str
+
+    def etag_for(self, answers: bool = True) -> str:
+        return self.etag if answers else self.answerless_etag
+
+    def response_body(
+        self, odapset_id: Optional[int] = None, answers: bool = True
+    ) -> bytes:
+        odapset_json = b"null" if odapset_id is None else str(odapset_id).encode()
+        qnas_json = self.qnas_json if answers else self.answerless_qnas_json
+        return b'{"odapset_id":' + odapset_json + b',"qnas":' + qnas_json + b"}"
+
+
+class QuestionBank:
+    """
+    읽기 전용 기출문제 뱅크. 만들어진 뒤에는 수정하지 않고, 다시 읽을 때는 통째로 교체한다.
+    """
+
+    def __init__(
+        self,
+        sets: Sequence[BankSet],
+        stamp: Optional[int],
+        cluster_ids: Optional[Mapping[int, int]] = None,
+    ):
+        self.sets = MappingProxyType({s.id: s for s in sets})
+        self.innings = MappingProxyType(
+            {(s.year, s.type, s.grade, s.inning): s for s in sets}
+        )
+        self.qnas = MappingProxyType({qna.id: qna for s in sets for qna in s.qnas})
+        self.answer_key = AnswerKey(self.qnas)
+        self.cluster_ids = MappingProxyType(dict(cluster_ids or {}))
+        self.cbt_pools = MappingProxyType(_build_cbt_pools(sets, self.cluster_ids))
+        self.search_index = NgramIndex(
+            list(self.qnas.keys()),
+            [qna_search_text(qna) for qna in self.qnas.values()],
+        )
+        # 유사 문제 표는 오래 걸리므로 build_similar()로 따로 만든다. 그 전에는 None.
+        self.similar: Optional[Mapping[int, Tuple[Tuple[int, float], ...]]] = None
+        self.stamp = stamp
+        self.checked_at = time.monotonic()
+
+    def get_inning(
+        self,
+        year: int,
+        license: GichulSetType,
+        level: GichulSetGrade,
+        round: GichulSetInning,
+    ) -> Optional[BankSet]:
+        return self.innings.get((year, license, level, round))
+
+    def build_similar(self):
+        self.similar = MappingProxyType(
+            _build_similar(list(self.sets.values()), self.cluster_ids)
+        )
+
+    def get_similar(self, qna_id: int) -> Optional[Tuple[Tuple[int, float], ...]]:
+        # 유사 문제 표를 아직 만드는 중이면 None
+        if self.similar is None:
+            return None
+        return self.similar.get(qna_id, ())
+
+    def get_cbt_pool(
+        self, license: GichulSetType, level: GichulSetGrade, subject: GichulSubject
+    ) -> Tuple[int, ...]:
+        return self.cbt_pools.get((license, level, subject), ())
+
+
+def _dedup_key(qna: QnaWithImgPaths) -> bytes:
+    # 공백과 대소문자 차이만 있는 문제는 같은 문제로 본다.
+    normalized = re.sub(r"\s+", "", f"{qna.questionstr}|{qna.ex1str}").casefold()
+    return hashlib.blake2b(normalized.encode(), digest_size=16).digest()
+
+
+def _build_cbt_pools(
+    sets: Sequence[BankSet], cluster_ids: Mapping[int, int]
+) -> Dict[PoolKey, Tuple[int, ...]]:
+    pools: Dict[PoolKey, List[int]] = {}
+    seen = set()
+    for s in sets:
+        for qna in s.qnas:
+            if not (qna.questionstr and qna.ex1str):
+                continue
+            pool_key = (s.type, s.grade, qna.subject)
+            # scripts/clusterdups.py로 묶인 유사 문제는 클러스터당 하나만 남긴다.
+            cluster_id = cluster_ids.get(qna.id)
+            dedup_keys = {(pool_key, _dedup_key(qna))}
+            if cluster_id is not None:
+                dedup_keys.add((pool_key, cluster_id))
+            if dedup_keys & seen:
+                continue
+            seen.update(dedup_keys)
+            pools.setdefault(pool_key, []).append(qna.id)
+    return {pool_key: tuple(ids) for pool_key, ids in pools.items()}
+
+
+def _build_similar(
+    sets: Sequence[BankSet], cluster_ids: Mapping[int, int]
+) -> Dict[int, Tuple[Tuple[int, float], ...]]:
+    # 유사 문제는 같은 면허 종류 안에서만 찾고, 같은 클러스터(거의 같은 문제)는 제외한다.
+    qnas_by_type: Dict[GichulSetType, List[QnaWithImgPaths]] = {}
+    for s in sets:
+        qnas_by_type.setdefault(s.type, []).extend(s.qnas)
+    similar = {}
+    for qnas in qnas_by_type.values():
+        similar.update(
+            tfidf_neighbors(
+                [qna.id for qna in qnas],
+                [qna_search_text(qna) for qna in qnas],
+                SIMILAR_TOP_K,
+                groups=[cluster_ids.get(qna.id, qna.id) for qna in qnas],
+            )
+        )
+    return similar
+
+
+def _json_etag(qnas_json: bytes) -> str:
+    return f'"{hashlib.sha256(qnas_json).hexdigest()[:32]}"'
+
+
+_bank: Optional[QuestionBank] = None
+_lock = threading.Lock()
+# 다시 읽을 때 색인(n-gram, TF-IDF 유사 문제) 만들기와 시작 후의 유사 문제 표 만들기는
+# 요청 밖의 이 스레드에서 한다.
+_reload_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="question-bank")
+_reload_future: Optional[Future] = None
+
+# (회차 정보, 회차의 문제들) 평문 dict. 세션과 분리되어 다른 스레드에서 써도 된다.
+BankRows = List[Tuple[Dict, List[Dict]]]
+
+
+def _stamp_path():
+    return settings.BASE_PATH / BANK_STAMP_NAME
+
+
+def _read_stamp() -> Optional[int]:
+    try:
+        return _stamp_path().stat().st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+def _read_bank_rows(db: Session) -> BankRows:
+    return [
+        (
+            gichulset.model_dump(include={"id", "type", "grade", "year", "inning"}),
+            [qna.model_dump() for qna in sorted(gichulset.qnas, key=lambda q: q.id)],
+        )
+        for gichulset in gichulset_crud.read_all_qna_sets_with_qnas(db)
+    ]
+
+
+def _build_from_rows(rows: BankRows, stamp: Optional[int]) -> QuestionBank:
+    bank_sets = []
+    cluster_ids = {}
+    for gichulset, qna_rows in rows:
+        cluster_ids.update(
+            (qna["id"], qna["cluster_id"])
+            for qna in qna_rows
+            if qna.get("cluster_id") is not None
+        )
+        directory = solve_utils.dir_maker(
+            str(gichulset["year"]),
+            gichulset["type"],
+            gichulset["grade"],
+            gichulset["inning"],
+        )
+        # 이미지 마커는 뱅크를 만들 때 한 번만 찾아 경로로 바꿔 둔다.
+        image_map = image_manifest.get(directory)
+        qnas = []
+        for qna_row in qna_rows:
+            qna = QnaWithImgPaths.model_validate(qna_row)
+            qnas.append(
+                qna.model_copy(
+                    update={
+                        "imgPaths": solve_utils.resolve_image_paths(
+                            solve_utils.find_image_markers(qna), image_map
+                        )
+                    }
+                )
+            )
+        qnas = tuple(qnas)
+        qnas_json = _qnas_adapter.dump_json(qnas)
+        # 해설에도 정답이 드러나므로 시험용 JSON에서는 함께 비운다.
+        answerless_qnas_json = _qnas_adapter.dump_json(
+            tuple(
+                qna.model_copy(update={"answer": None, "explanation": None})
+                for qna in qnas
+            )
+        )
+        bank_sets.append(
+            BankSet(
+                **gichulset,
+                qnas=qnas,
+                qnas_json=qnas_json,
+                etag=_json_etag(qnas_json),
+                answerless_qnas_json=answerless_qnas_json,
+                answerless_etag=_json_etag(answerless_qnas_json),
+            )
+        )
+    return QuestionBank(bank_sets, stamp, cluster_ids)
+
+
+def build_question_bank(db: Session) -> QuestionBank:
+    stamp = _read_stamp()
+    return _build_from_rows(_read_bank_rows(db), stamp)
+
+
+def _install(new_bank: QuestionBank) -> QuestionBank:
+    global _bank
+    _bank = new_bank
+    logger.info(
+        f"question bank loaded: {len(new_bank.sets)} sets, {len(new_bank.qnas)} qnas"
+    )
+    return new_bank
+
+
+def load_question_bank(db: Session) -> QuestionBank:
+    """
+    뱅크를 바로 만들어 교체한다. 시작할 때와 테스트에서 쓴다.
+    유사 문제 표는 시작을 늦추지 않도록 백그라운드에서 만들고, 그동안 /similar는 503으로 답한다.
+    """
+    global _reload_future
+    bank = _install(build_question_bank(db))
+    _reload_future = _reload_executor.submit(_build_similar_in_background, bank)
+    return bank
+
+
+def is_question_bank_loaded() -> bool:
+    return _bank is not None
+
+
+def _is_stale(bank: QuestionBank) -> bool:
+    now = time.monotonic()
+    if now - bank.checked_at < STAMP_CHECK_INTERVAL_SEC:
+        return False
+    bank.checked_at = now
+    return _read_stamp() != bank.stamp
+
+
+def _build_similar_in_background(bank: QuestionBank):
+    try:
+        bank.build_similar()
+    except Exception:
+        # 다음에 뱅크를 다시 만들 때까지 /similar는 503으로 답한다.
+        logger.exception("failed to build similar questions")
+
+
+def _rebuild_in_background(rows: BankRows, stamp: Optional[int]):
+    try:
+        new_bank = _build_from_rows(rows, stamp)
+        # 교체 뒤에 /similar가 비지 않도록 유사 문제 표까지 만든 뒤 교체한다.
+        new_bank.build_similar()
+    except Exception:
+        # 다음 STAMP_CHECK_INTERVAL_SEC 뒤의 확인에서 다시 시도한다.
+        logger.exception("failed to rebuild the question bank")
+        return
+    with _lock:
+        _install(new_bank)
+
+
+def _reload_if_current(db: Session, bank: Optional[QuestionBank]) -> QuestionBank:
+    """
+    뱅크가 없으면 바로 만든다. 있으면 DB에서 행만 읽어 두고 색인은 백그라운드에서 만들어
+    끝나면 교체하며, 그동안 요청은 기존 뱅크로 처리한다.
+    """
+    global _reload_future
+    with _lock:
+        if _bank is not bank:
+            # 다른 요청이 이미 바꿨다.
+            return _bank
+        if bank is None:
+            return load_question_bank(db)
+        if _reload_future is None or _reload_future.done():
+            stamp = _read_stamp()
+            _reload_future = _reload_executor.submit(
+                _rebuild_in_background, _read_bank_rows(db), stamp
+            )
+        return bank
+
+
+def wait_for_question_bank_reload(timeout: Optional[float] = None):
+    """
+    백그라운드의 뱅크 다시 만들기나 유사 문제 표 만들기가 끝날 때까지 기다린다. 테스트에서 쓴다.
+    """
+    future = _reload_future
+    if future is not None:
+        future.result(timeout)
+
+
+def get_question_bank(db: Session) -> QuestionBank:
+    bank = _bank
+    if bank is None or _is_stale(bank):
+        bank = _reload_if_current(db, bank)
+    return bank
+
+
+async def get_question_bank_async(db: AsyncSession) -> QuestionBank:
+    bank = _bank
+    if bank is None or _is_stale(bank):
+        # 다시 읽어야 할 때만 비동기 세션의 동기 프록시로 읽는다.
+        # _is_stale이 checked_at을 갱신하므로 여기서 다시 판단하지 않는다.
+        bank = await db.run_sync(_reload_if_current, bank)
+    return bank
+
+
+def request_question_bank_reload():
+    """
+    실행 중인 모든 워커에 뱅크를 다시 읽으라고 알린다. 임포트 스크립트에서 호출한다.
+    """
+    _stamp_path().touch()
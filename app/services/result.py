@@ -1,7 +1,8 @@
 from collections import defaultdict
-from typing import Annotated, Optional
+from typing import Annotated, Dict, List, Optional, Sequence, Tuple, TypeVar, Union
 from fastapi import APIRouter, Depends, HTTPException
 from sqlmodel import Session, SQLModel, Field
+from sqlmodel.ext.asyncio.session import AsyncSession
 from sqlalchemy.exc import IntegrityError
 from ..schemas import UserSolvedQna, ManyResults, ResultsGot, OneResult
 from ..models import (
@@ -13,67 +14,155 @@ from ..models import (
     GichulSetGrade,
     GichulSetInning,
     GichulSetType,
+    GichulSubject,
 )
 from ..crud.user_crud import read_one_user
-from ..crud import result_crud, resultset_crud, gichulset_crud
+from ..crud import result_crud, resultset_crud, gichulset_crud, user_odap_crud
+from ..crud import async_result_crud, async_resultset_crud, async_user_odap_crud
 from ..utils import result_utils
-from ..utils.solve_utils import path_getter
+from ..core.config import settings
+from .question_bank import BankSet, get_question_bank, get_question_bank_async
+from .result_buffer import result_buffer
 
+# 마이페이지 한 페이지의 세션 수
+MYPAGE_PAGE_SIZE = 20
+MYPAGE_PAGE_SIZE_MAX = 50
 
-def save_user_solved_qna(submitted_qna: UserSolvedQna, current_user: User, db: Session):
+T = TypeVar("T")
+
+
+def _before_id(cursor: Optional[str], kind: str = "rs") -> Optional[int]:
+    if cursor is None:
+        return None
+    before_id = result_utils.decode_cursor(cursor, kind)
+    if before_id is None:
+        raise HTTPException(status_code=422, detail="invalid cursor")
+    return before_id
+
+
+def _split_page(rows: Sequence[T], limit: int) -> Tuple[Sequence[T], Optional[str]]:
+    # limit + 1개를 읽어 다음 페이지가 있는지 판단한다.
+    if len(rows) <= limit:
+        return rows, None
+    page = rows[:limit]
+    return page, result_utils.encode_cursor(page[-1].id)
+
+
+async def save_user_solved_qna(
+    submitted_qna: UserSolvedQna, current_user: User, db: AsyncSession
+):
     odapset_id = submitted_qna.odapset_id
-    resultset_to_update = resultset_crud.read_one_resultset(
+    resultset_to_update = await async_resultset_crud.read_one_resultset(
         odapset_id, current_user.id, db
     )
     if resultset_to_update is None:
         raise HTTPException(
             status_code=404, detail=f"Resultset with id = {odapset_id} not found"
         )
-    is_correct = submitted_qna.answer == submitted_qna.choice
-    new_result = Result(
-        choice=submitted_qna.choice,
-        correct=is_correct,
-        gichulqna_id=submitted_qna.gichulqna_id,
-        resultset_id=odapset_id,
-    )
-    result_crud.create_one_result(new_result, db)
-    db.commit()
-    return new_result
+    bank = await get_question_bank_async(db)
+    if submitted_qna.gichulqna_id not in bank.qnas:
+        # 정답표는 없는 id를 오답으로 채점하므로, 버퍼에 넣기 전에 여기서 거른다.
+        raise HTTPException(
+            status_code=404,
+            detail=f"GichulQna with id = {submitted_qna.gichulqna_id} not found",
+        )
+    is_correct = bank.answer_key.grade(
+        [submitted_qna.gichulqna_id], [submitted_qna.choice]
+    )
+    new_result = Result.model_validate(
+        {
+            "choice": submitted_qna.choice,
+            "correct": bool(is_correct[0]),
+            "gichulqna_id": submitted_qna.gichulqna_id,
+            "resultset_id": odapset_id,
+        }
+    ).model_dump(exclude={"id"})
+    if settings.RESULT_WRITE_BEHIND:
+        # 검증까지 마치면 바로 응답하고, 쓰기는 버퍼가 모아서 한다. id는 아직 없다.
+        if not result_buffer.add(current_user.id, new_result):
+            raise HTTPException(
+                status_code=503,
+                detail="Too many answers waiting to be saved, try again shortly",
+                headers={"Retry-After": "1"},
+            )
+        return {**new_result, "id": None}
+    [result_id] = await async_result_crud.insert_results_returning_ids([new_result], db)
+    if result_utils.is_wrong_answer(new_result):
+        await async_user_odap_crud.record_wrong_results(
+            current_user.id, [Result(id=result_id, **new_result)], db
+        )
+    await db.commit()
+    return {**new_result, "id": result_id}
 
 
-def save_user_solved_many_qnas(
-    submitted_results: ManyResults, current_user: User, db: Session
+async def save_user_solved_many_qnas(
+    submitted_results: ManyResults, current_user: User, db: AsyncSession
 ):
     odapset_id = submitted_results.odapset_id
-    resultset_to_update = resultset_crud.read_one_resultset(
+    resultset_to_update = await async_resultset_crud.read_one_resultset(
         odapset_id, current_user.id, db
     )
     if resultset_to_update is None:
         raise HTTPException(
             status_code=404, detail=f"Resultset with id = {odapset_id} not found"
         )
-    resultset_to_update.duration_sec = submitted_results.duration_sec
-    resultlist = [
-        Result(
-            choice=result.choice,
-            correct=(result.choice == result.answer),
-            gichulqna_id=result.gichulqna_id,
-            resultset_id=odapset_id,
+    bank = await get_question_bank_async(db)
+    submitted = submitted_results.results
+    qna_ids = [result.gichulqna_id for result in submitted]
+    unknown_ids = [qna_id for qna_id in qna_ids if qna_id not in bank.qnas]
+    if unknown_ids:
+        raise HTTPException(
+            status_code=404, detail=f"GichulQna with id = {unknown_ids[0]} not found"
         )
-        for result in submitted_results.results
+    # 방금 쓴 결과를 다시 읽지 않고, 제출된 답과 메모리의 정답표로 바로 채점한다.
+    corrects, subject_counts = bank.answer_key.score(
+        qna_ids, [result.choice for result in submitted]
+    )
+    # 행마다 Result 모델 검증을 거친 뒤, 쓰기는 Core 수준의 일괄 INSERT로 한다.
+    rows = [
+        Result.model_validate(
+            {
+                "choice": result.choice,
+                "correct": bool(correct),
+                "gichulqna_id": result.gichulqna_id,
+                "resultset_id": odapset_id,
+            }
+        ).model_dump(exclude={"id"})
+        for result, correct in zip(submitted, corrects)
     ]
-    result_crud.create_many_results(resultlist, db)
-    db.flush()
-    db_resultset = resultset_crud.read_one_resultset_for_score(
-        odapset_id, current_user.id, db
+    # 오답노트에 id가 필요한 틀린 풀이만 id를 돌려받고(MySQL에서는 한 행씩), 나머지는 한 번의
+    # 여러 행 INSERT로 쓴다. 다시 읽지 않으므로 같은 세션에 동시에 저장된 풀이와 섞이지 않는다.
+    wrong_rows = [row for row in rows if result_utils.is_wrong_answer(row)]
+    await async_result_crud.insert_many_results(
+        [row for row in rows if not result_utils.is_wrong_answer(row)], db
     )
-    info_to_return, total_amount, total_score, total_passed = _process_single_resultset(
-        db_resultset, None, db
+    result_ids = await async_result_crud.insert_results_returning_ids(wrong_rows, db)
+    wrong_results = [
+        Result(id=result_id, **row) for row, result_id in zip(wrong_rows, result_ids)
+    ]
+    if wrong_results:
+        await async_user_odap_crud.record_wrong_results(
+            current_user.id, wrong_results, db
+        )
+    sample_gichulset = bank.sets[bank.qnas[qna_ids[0]].gichulset_id]
+    info_to_return, total_amount, total_score, total_passed = _score_details(
+        resultset_to_update, sample_gichulset, subject_counts
     )
-    db_resultset.total_amount = total_amount
-    db_resultset.total_score = total_score
-    db_resultset.passed = total_passed
-    db.commit()
+    info_to_return["duration_sec"] = submitted_results.duration_sec
+    # 마이페이지가 다시 채점하지 않도록 과목별 점수를 같은 트랜잭션에서 기록한다.
+    await async_resultset_crud.replace_subject_scores(
+        odapset_id, info_to_return["subject_scores"], db
+    )
+    await async_resultset_crud.update_resultset_totals(
+        odapset_id,
+        db,
+        gichulset_id=sample_gichulset.id,
+        duration_sec=submitted_results.duration_sec,
+        total_amount=total_amount,
+        total_score=total_score,
+        passed=total_passed,
+    )
+    await db.commit()
     info_to_return.pop("resultset_id", None)
     return info_to_return
 
@@ -99,43 +188,82 @@ def retrieve_many_user_saved_qnas(current_user: User, db: Session):
     return odaps_to_show
 
 
-def retrieve_mypage_odaps(current_user: User, db: Session):
-    odapsets = resultset_crud.read_mypage_odaps_in_resultsets(current_user.id, db)
-    unique_qnas = result_utils.leave_the_latest_qnas(odapsets)
-    unique_qnas_with_imgPaths = result_utils.append_imgPaths(unique_qnas)
-    return unique_qnas_with_imgPaths
+def retrieve_mypage_odaps(
+    current_user: User,
+    db: Session,
+    cursor: Optional[str] = None,
+    limit: int = MYPAGE_PAGE_SIZE,
+) -> Tuple[List[Dict], Optional[str]]:
+    before_result_id = _before_id(cursor, "od")
+    # user_odap 인덱스만 훑고, 문제 본문과 회차 정보는 메모리의 뱅크에서 붙인다.
+    odaps = user_odap_crud.read_user_odaps(
+        current_user.id, db, before_result_id, limit + 1
+    )
+    next_cursor = None
+    if len(odaps) > limit:
+        odaps = odaps[:limit]
+        next_cursor = result_utils.encode_cursor(odaps[-1].result_id, "od")
+    bank = get_question_bank(db)
+    odaps_to_show = []
+    for odap in odaps:
+        qna = bank.qnas.get(odap.gichulqna_id)
+        if qna is None:
+            continue
+        gichulset = bank.sets[qna.gichulset_id]
+        qna_dict = qna.model_dump(exclude={"imgPaths"})
+        qna_dict["gichulset"] = {
+            "year": gichulset.year,
+            "type": gichulset.type,
+            "grade": gichulset.grade,
+            "inning": gichulset.inning,
+        }
+        qna_dict["choice"] = odap.choice
+        qna_dict["result_id"] = odap.result_id
+        qna_dict["hidden"] = odap.hidden
+        qna_dict["attempt_counts"] = odap.attempt_counts
+        if qna.imgPaths:
+            qna_dict["imgPaths"] = qna.imgPaths
+        odaps_to_show.append(qna_dict)
+    return odaps_to_show, next_cursor
 
 
-def hide_saved_user_qna(id: int, current_user: User, db: Session):
+async def hide_saved_user_qna(id: int, current_user: User, db: AsyncSession):
     assert current_user.id is not None
-    result_to_hide = result_crud.read_one_result_to_hide(id, current_user.id, db)
+    result_to_hide = await async_result_crud.read_one_result_to_hide(
+        id, current_user.id, db
+    )
     if result_to_hide is None:
         raise HTTPException(status_code=404, detail="no such a result saved")
     result_to_hide.hidden = True
     db.add(result_to_hide)
-    db.commit()
+    await async_user_odap_crud.hide_odap(current_user.id, id, db)
+    await db.commit()
     return
 
 
-def _process_single_resultset(
-    iter_resultset: ResultSet, sample_gichulset: Optional[GichulSet], db: Session
-):
-    sample_gichulset_id, subject_scores = result_utils.score_answers(iter_resultset)
-    if not sample_gichulset:
-        sample_gichulset = gichulset_crud.read_one_qna_set(sample_gichulset_id, db)
-    total_amount, total_score, total_passed, final_subject_scores = (
-        result_utils.check_if_passed(sample_gichulset.type, subject_scores)
-    )
-    exam_detail = (
+def _exam_detail(
+    examtype: ExamType, sample_gichulset: Union[GichulSet, BankSet]
+) -> str:
+    return (
         f"{sample_gichulset.year}년 {sample_gichulset.inning.value}회차 {sample_gichulset.type.value} {sample_gichulset.grade.value}급"
-        if iter_resultset.examtype != ExamType.cbt
+        if examtype != ExamType.cbt
         else f"{sample_gichulset.type.value} {sample_gichulset.grade.value}급 모의고사"
     )
+
+
+def _score_details(
+    iter_resultset: ResultSet,
+    sample_gichulset: Union[GichulSet, BankSet],
+    subject_counts: Sequence[result_utils.SubjectCount],
+):
+    total_amount, total_score, total_passed, final_subject_scores = (
+        result_utils.check_if_passed(sample_gichulset.type, subject_counts)
+    )
     return (
         {
             "resultset_id": iter_resultset.id,
             "duration_sec": iter_resultset.duration_sec,
-            "exam_detail": exam_detail,
+            "exam_detail": _exam_detail(iter_resultset.examtype, sample_gichulset),
             "total_amount_of_questions": total_amount,
             "total_correct_counts": total_score,
             "total_score": total_score * 4,
@@ -148,28 +276,109 @@ def _process_single_resultset(
     )
 
 
-def retrieve_session_resultsets(current_user: User, db: Session, is_cbt: bool):
+def materialize_subject_scores(resultsets: Sequence[ResultSet], db: Session) -> int:
+    """
+    resultset_subject_score 없이 저장된 세션을 한 번만 채점해 기록한다.
+    과목별 개수는 여러 세션을 묶어 DB의 GROUP BY로 센다. 마이페이지와 scripts/backfillscores.py가 사용한다.
+    """
+    subject_counts = defaultdict(list)
+    sample_gichulset_ids = {}
+    for resultset_id, subject, question_counts, correct_counts, gichulset_id in (
+        resultset_crud.read_subject_counts([rs.id for rs in resultsets], db)
+    ):
+        subject_counts[resultset_id].append(
+            (subject, question_counts, correct_counts)
+        )
+        sample_gichulset_ids.setdefault(resultset_id, gichulset_id)
+    db_gichulsets = gichulset_crud.read_many_gichulset_by_ids(
+        set(sample_gichulset_ids.values()), db
+    )
+    gichulsets_dict = {gichulset.id: gichulset for gichulset in db_gichulsets}
+    for resultset in resultsets:
+        gichulset_id = sample_gichulset_ids[resultset.id]
+        details, total_amount, total_score, total_passed = _score_details(
+            resultset, gichulsets_dict[gichulset_id], subject_counts[resultset.id]
+        )
+        resultset_crud.replace_subject_scores(
+            resultset.id, details["subject_scores"], db
+        )
+        resultset_crud.update_resultset_totals(
+            resultset.id,
+            db,
+            gichulset_id=gichulset_id,
+            total_amount=total_amount,
+            total_score=total_score,
+            passed=total_passed,
+        )
+    db.commit()
+    return len(resultsets)
+
+
+def retrieve_session_resultsets(
+    current_user: User,
+    db: Session,
+    is_cbt: bool,
+    cursor: Optional[str] = None,
+    limit: int = MYPAGE_PAGE_SIZE,
+) -> Tuple[List[Dict], Optional[str]]:
     examtype = ExamType.cbt if is_cbt else ExamType.real
-    db_resultsets = resultset_crud.read_many_resultsets_with_results_for_score(
-        examtype, current_user.id, db
+    before_id = _before_id(cursor)
+    unscored_resultsets = resultset_crud.read_unscored_resultsets_for_score(
+        db, examtype, current_user.id
     )
-    sample_gichulset_ids = set(
-        [
-            resultset.results[0].gichul_qna.gichulset_id
-            for resultset in db_resultsets
-            if resultset.results
-        ]
+    if unscored_resultsets:
+        materialize_subject_scores(unscored_resultsets, db)
+
+    # 제출할 때 기록한 총점과 과목별 점수만 읽는다. 결과와 문제 행은 읽지 않는다.
+    db_resultsets, next_cursor = _split_page(
+        resultset_crud.read_scored_resultsets(
+            examtype, current_user.id, db, before_id, limit + 1
+        ),
+        limit,
     )
-    db_gichulsets = gichulset_crud.read_many_gichulset_by_ids(sample_gichulset_ids, db)
-    gichulsets_dict = {gichulset.id: gichulset for gichulset in db_gichulsets}
+    subject_scores_by_resultset: Dict[int, Dict] = defaultdict(dict)
+    for score in resultset_crud.read_subject_scores(
+        [resultset.id for resultset in db_resultsets], db
+    ):
+        subject_scores_by_resultset[score.resultset_id][score.subject] = {
+            "question_counts": score.question_counts,
+            "correct_counts": score.correct_counts,
+            "passed": score.passed,
+        }
+    gichulsets_dict: Dict[int, Union[GichulSet, BankSet]] = dict(
+        get_question_bank(db).sets
+    )
+    missing_gichulset_ids = {
+        resultset.gichulset_id
+        for resultset in db_resultsets
+        if resultset.gichulset_id not in gichulsets_dict
+    }
+    if missing_gichulset_ids:
+        gichulsets_dict.update(
+            (gichulset.id, gichulset)
+            for gichulset in gichulset_crud.read_many_gichulset_by_ids(
+                missing_gichulset_ids, db
+            )
+        )
     info_to_return = []
     for resultset in db_resultsets:
-        gichulset_id = (
-            resultset.results[0].gichul_qna.gichulset_id if resultset.results else None
+        subject_scores = subject_scores_by_resultset[resultset.id]
+        info_to_return.append(
+            {
+                "resultset_id": resultset.id,
+                "duration_sec": resultset.duration_sec,
+                "exam_detail": _exam_detail(
+                    resultset.examtype, gichulsets_dict[resultset.gichulset_id]
+                ),
+                "total_amount_of_questions": resultset.total_amount,
+                "total_correct_counts": resultset.total_score,
+                "total_score": resultset.total_score * 4,
+                "if_passed_test": resultset.passed,
+                "subject_scores": {
+                    subject: subject_scores[subject]
+                    for subject in GichulSubject
+                    if subject in subject_scores
+                },
+            }
         )
-        if gichulset_id:
-            scored_session_details, _, _, _ = _process_single_resultset(
-                resultset, gichulsets_dict[gichulset_id], db
-            )
-            info_to_return.append(scored_session_details)
-    return info_to_return
+    return info_to_return, next_cursor
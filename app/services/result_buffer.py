@@ -0,0 +1,146 @@
+import logging
+import threading
+from collections import defaultdict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from sqlalchemy.exc import DataError, IntegrityError
+from sqlmodel import Session
+from ..core.config import settings
+from ..crud import result_crud, user_odap_crud
+from ..database import engine
+from ..models import Result
+from ..utils.result_utils import is_wrong_answer
+
+logger = logging.getLogger(__name__)
+
+# (user_id, 검증을 마친 Result 행)
+PendingRow = Tuple[int, Dict[str, Any]]
+
+
+class ResultWriteBuffer:
+    """
+    /results/save의 풀이를 모아 두었다가 한 트랜잭션에서 여러 행 INSERT로 쓴다.
+    시간(RESULT_BUFFER_FLUSH_SEC) 또는 개수(RESULT_BUFFER_FLUSH_ROWS) 조건에서 백그라운드 스레드가 비우고,
+    RESULT_BUFFER_MAX_ROWS만큼 쌓이면 더 받지 않고 백그라운드 스레드를 깨운다. 요청은 이벤트 루프에서
+    처리되므로 호출한 쪽이 직접 쓰지 않고 거절(503)한다(배압). 종료 시 close()로 남은 것을 쓴다.
+    """
+
+    def __init__(self, session_factory: Callable[[], Session] = lambda: Session(engine)):
+        self._session_factory = session_factory
+        self._pending: List[PendingRow] = []
+        self._lock = threading.Lock()
+        # 한 번에 하나의 flush만 DB에 쓰도록 한다.
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._closed = False
+        self._thread: Optional[threading.Thread] = None
+
+    def add(self, user_id: int, row: Dict[str, Any]) -> bool:
+        """
+        버퍼가 가득 차 있으면 행을 받지 않고 False를 돌려준다.
+        """
+        with self._lock:
+            accepted = len(self._pending) < settings.RESULT_BUFFER_MAX_ROWS
+            if accepted:
+                self._pending.append((user_id, row))
+            pending = len(self._pending)
+            self._ensure_thread()
+        if pending >= settings.RESULT_BUFFER_FLUSH_ROWS:
+            self._wakeup.set()
+        return accepted
+
+    def pending_count(self) -> int:
+        return len(self._pending)
+
+    def flush(self) -> int:
+        with self._flush_lock:
+            with self._lock:
+                rows, self._pending = self._pending, []
+            if not rows:
+                return 0
+            try:
+                self._write(rows)
+                return len(rows)
+            except Exception:
+                logger.exception(
+                    f"failed to flush {len(rows)} buffered results, retrying one by one"
+                )
+            # 한 행 때문에 다른 사용자의 풀이까지 막히지 않도록 한 행씩 다시 쓴다.
+            written = 0
+            for i, row in enumerate(rows):
+                try:
+                    self._write([row])
+                    written += 1
+                except (IntegrityError, DataError):
+                    # 그 행 자체가 잘못된 경우(지워진 세션 등). 다시 시도해도 실패하므로 버린다.
+                    logger.exception(f"dropped an invalid buffered result: {row}")
+                except Exception:
+                    # DB 장애 등. 남은 행은 다음 flush에서 다시 시도한다.
+                    logger.exception(f"failed to flush {len(rows) - i} buffered results")
+                    self._requeue(rows[i:])
+                    break
+            return written
+
+    def _write(self, rows: List[PendingRow]):
+        with self._session_factory() as db:
+            write_results(rows, db)
+            db.commit()
+
+    def _requeue(self, rows: List[PendingRow]):
+        with self._lock:
+            # 자리가 있으면 다음 flush에서 다시 시도한다.
+            room = settings.RESULT_BUFFER_MAX_ROWS - len(self._pending)
+            if room < len(rows):
+                logger.error(f"dropped {len(rows) - max(room, 0)} buffered results")
+            self._pending = rows[: max(room, 0)] + self._pending
+
+    def close(self):
+        self._closed = True
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.flush()
+        self._closed = False
+
+    def _ensure_thread(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(
+                target=self._run, name="result-write-behind", daemon=True
+            )
+            self._thread.start()
+
+    def _run(self):
+        while not self._closed:
+            self._wakeup.wait(settings.RESULT_BUFFER_FLUSH_SEC)
+            self._wakeup.clear()
+            if self._closed:
+                break
+            self.flush()
+
+
+def write_results(rows: List[PendingRow], db: Session):
+    """
+    풀이 행을 쓰고, 틀린 풀이는 돌려받은 id로 사용자별 오답노트에 반영한다. 커밋은 호출한 쪽에서 한다.
+    오답노트에 id가 필요한 틀린 풀이만 id를 돌려받고(MySQL에서는 한 행씩), 나머지는 한 번의
+    여러 행 INSERT로 쓴다.
+    """
+    wrong_rows = [(user_id, row) for user_id, row in rows if is_wrong_answer(row)]
+    result_crud.insert_many_results(
+        [row for _, row in rows if not is_wrong_answer(row)], db
+    )
+    result_ids = result_crud.insert_results_returning_ids([row for _, row in wrong_rows], db)
+    for user_id, wrong_results in _wrong_results_by_user(wrong_rows, result_ids).items():
+        user_odap_crud.record_wrong_results(user_id, wrong_results, db)
+    return len(rows)
+
+
+def _wrong_results_by_user(
+    wrong_rows: List[PendingRow], result_ids: List[int]
+) -> Dict[int, List[Result]]:
+    wrong_by_user: Dict[int, List[Result]] = defaultdict(list)
+    for (user_id, row), result_id in zip(wrong_rows, result_ids):
+        wrong_by_user[user_id].append(Result(id=result_id, **row))
+    return wrong_by_user
+
+
+result_buffer = ResultWriteBuffer()
@@ -0,0 +1,32 @@
+from typing import List
+from fastapi import HTTPException
+from sqlmodel import Session
+from ..schemas import SearchResult, SimilarQna
+from .question_bank import get_question_bank
+
+
+def search_qnas(q: str, limit: int, db: Session) -> List[SearchResult]:
+    bank = get_question_bank(db)
+    return [
+        SearchResult(**bank.qnas[qna_id].model_dump(), score=score)
+        for qna_id, score in bank.search_index.search(q, limit)
+    ]
+
+
+def retrieve_similar_qnas(gichulqna_id: int, limit: int, db: Session) -> List[SimilarQna]:
+    bank = get_question_bank(db)
+    if gichulqna_id not in bank.qnas:
+        raise HTTPException(
+            status_code=404, detail=f"GichulQna with id = {gichulqna_id} not found"
+        )
+    similar = bank.get_similar(gichulqna_id)
+    if similar is None:
+        raise HTTPException(
+            status_code=503,
+            detail="Similar questions are being prepared, try again shortly",
+            headers={"Retry-After": "5"},
+        )
+    return [
+        SimilarQna(**bank.qnas[qna_id].model_dump(), similarity=similarity)
+        for qna_id, similarity in similar[:limit]
+    ]
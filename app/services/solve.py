@@ -1,10 +1,18 @@
+from pathlib import PurePosixPath
 from typing import Literal, Optional
 from sqlmodel import Session
-from fastapi import HTTPException, status
+from fastapi import HTTPException, Response, status
+from fastapi.responses import FileResponse
 from ..models import GichulSetType, GichulSetInning, GichulSetGrade, ExamType, User
 from ..utils import solve_utils
-from ..crud import resultset_crud, solve_crud
-from ..schemas import SolveResponse, QnaWithImgPaths
+from ..utils.image_manifest import image_manifest
+from ..utils import image_variants
+from ..utils.image_bundle import image_bundles, bundle_etag
+from ..crud import resultset_crud
+from .question_bank import get_question_bank
+
+# 이미지 파일은 이름이 바뀌지 않는 한 내용도 바뀌지 않으므로 오래 캐시하게 한다.
+IMAGE_CACHE_CONTROL = "public, max-age=31536000, immutable"
 
 
 def retrieve_one_inning(
@@ -15,26 +23,98 @@ def retrieve_one_inning(
     round: GichulSetInning,
     db: Session,
     current_user: Optional[User],
-) -> SolveResponse:
-    gichulset = solve_crud.get_one_inning(year, license, level, round, db)
-    if gichulset is None:
+    if_none_match: Optional[str] = None,
+    answers: bool = True,
+) -> Response:
+    bank_set = get_question_bank(db).get_inning(int(year), license, level, round)
+    if bank_set is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="검색 실패: 기출 문제 없음"
         )
 
-    # 경로 정보 생성
-    directory = solve_utils.dir_maker(year, license, level, round)
-    path_dict = solve_utils.path_getter(directory)
-    path_cache = {gichulset.id: path_dict}
+    # 익명 응답은 회차마다 항상 같으므로 ETag로 재검증할 수 있다.
+    if current_user is None:
+        etag = bank_set.etag_for(answers)
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if solve_utils.etag_matches(if_none_match, etag):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        return Response(
+            content=bank_set.response_body(answers=answers),
+            media_type="application/json",
+            headers=headers,
+        )
+    # 로그인 사용자는 요청마다 새 odapset_id를 받아야 하므로 캐시하지 않는다.
+    new_resultset = resultset_crud.create_one_resultset(examtype, current_user.id, db)
+    return Response(
+        content=bank_set.response_body(new_resultset.id, answers),
+        media_type="application/json",
+        headers={"Cache-Control": "no-store"},
+    )
+
+
+def serve_one_image(
+    endpath: str,
+    if_none_match: Optional[str] = None,
+    width: Optional[int] = None,
+    fmt: Literal["png", "webp"] = "png",
+) -> Response:
+    rel_path = PurePosixPath(endpath)
+    if rel_path.is_absolute() or ".." in rel_path.parts:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="접근이 허용되지 않은 경로입니다.",
+        )
+    image_file = image_manifest.get_file(rel_path.as_posix())
+    if image_file is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="이미지를 찾을 수 없습니다.",
+        )
+    width = image_variants.snap_width(width)
+    is_original = width is None and fmt == "png"
+    etag = (
+        image_file.etag
+        if is_original
+        else f'"{image_variants.variant_key(image_file, width, fmt)}"'
+    )
+    headers = {"ETag": etag, "Cache-Control": IMAGE_CACHE_CONTROL}
+    if solve_utils.etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    if is_original:
+        return FileResponse(
+            path=image_file.path,
+            media_type="image/png",
+            headers=headers,
+            stat_result=image_file.stat_result,
+        )
+    variant_path = image_variants.image_variants.get(image_file, width, fmt)
+    return FileResponse(
+        path=variant_path,
+        media_type=image_variants.VARIANT_MEDIA_TYPES[fmt],
+        headers=headers,
+    )
 
-    # 문제 목록을 딕셔너리로 변환 후 이미지 경로 추가
-    qnas_as_dicts = [qna.model_dump() for qna in gichulset.qnas]
-    new_qnas_list = solve_utils.attach_image_paths(qnas_as_dicts, path_cache)
 
-    pdt_validated_list = [
-        QnaWithImgPaths.model_validate(qna_dict) for qna_dict in new_qnas_list
+def serve_inning_image_bundle(
+    gichulset_id: int, db: Session, if_none_match: Optional[str] = None
+) -> Response:
+    bank_set = get_question_bank(db).sets.get(gichulset_id)
+    if bank_set is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="검색 실패: 기출 문제 없음"
+        )
+    rel_paths = sorted({path for qna in bank_set.qnas for path in qna.imgPaths or ()})
+    members = [
+        (rel_path, image_file)
+        for rel_path in rel_paths
+        if (image_file := image_manifest.get_file(rel_path)) is not None
     ]
-    if current_user is None:
-        return SolveResponse(qnas=pdt_validated_list)
-    new_resultset = resultset_crud.create_one_resultset(examtype, current_user.id, db)
-    return SolveResponse(odapset_id=new_resultset.id, qnas=pdt_validated_list)
+    etag = bundle_etag(members)
+    headers = {"ETag": etag, "Cache-Control": "public, max-age=86400"}
+    if solve_utils.etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(
+        content=image_bundles.get(etag, members),
+        media_type="application/zip",
+        headers=headers,
+    )
@@ -1,22 +1,21 @@
 from datetime import timedelta
 from typing import Union
+from sqlalchemy.exc import SQLAlchemyError
 from sqlmodel import Session
 from fastapi import HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from google.oauth2 import id_token
-from google.auth.transport import requests as google_requests
+import httpx
 from ..models import User
 from ..crud import user_crud
 from ..schemas import CreateUser, CreateUserResponse, Token, UserBase
-from ..core.security import pwd_context, ACCESS_TOKEN_EXPIRE_MINUTES
+from ..core.security import ACCESS_TOKEN_EXPIRE_MINUTES
 from ..core.config import settings
 from ..utils import user_utils
+from ..utils.google_oauth import google_oauth
+from ..utils.password_hasher import password_hasher
 
 
-google_client_id = settings.GOOGLE_CLIENT_ID
-
-
-def register_one_user(
+async def register_one_user(
     user_in: CreateUser,
     db: Session,
 ):
@@ -25,7 +24,7 @@ def register_one_user(
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT, detail="User already registered"
         )
-    hashed_password = pwd_context.hash(user_in.password)
+    hashed_password = await password_hasher.hash(user_in.password)
     user_in_dict = user_in.model_dump(exclude={"password"})
     user_in_dict.update({"hashed_password": hashed_password})
     regi_user = User(**user_in_dict)
@@ -42,28 +41,30 @@ def register_one_user(
     return CreateUserResponse(email=db_user.username, name=db_user.indivname)
 
 
-def sign_user_in(form_data: OAuth2PasswordRequestForm, db: Session):
-    db_user = user_utils.authenticate_user(form_data, db)
+async def sign_user_in(form_data: OAuth2PasswordRequestForm, db: Session):
+    db_user = await user_utils.authenticate_user(form_data, db)
     if not db_user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid username or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    if db.is_modified(db_user):
+        # 다시 해시한 비밀번호. 저장에 실패해도 로그인은 그대로 진행한다.
+        try:
+            db.commit()
+        except SQLAlchemyError:
+            db.rollback()
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = user_utils.create_access_token(
-        {"sub": db_user.username}, access_token_expires
+        {"sub": db_user.username, "uid": db_user.id}, access_token_expires
     )
     return Token(access_token=access_token, token_type="bearer")
 
 
-def sign_google_user(id_token_jwt: Union[str, bytes], db: Session):
+async def sign_google_user(id_token_jwt: Union[str, bytes], db: Session):
     try:
-        idinfo = id_token.verify_oauth2_token(
-            id_token_jwt,
-            google_requests.Request(),
-            google_client_id,
-        )
+        idinfo = await google_oauth.verify_id_token(id_token_jwt)
         google_user = user_crud.read_one_google_user(idinfo["sub"], db)
         if google_user is not None:
             db_user = google_user
@@ -78,10 +79,15 @@ def sign_google_user(id_token_jwt: Union[str, bytes], db: Session):
             db.commit()
         access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
         access_token = user_utils.create_access_token(
-            {"sub": db_user.username}, access_token_expires
+            {"sub": db_user.username, "uid": db_user.id}, access_token_expires
         )
         return access_token
     except ValueError as e:
         print(e)
         db.rollback()
         raise HTTPException(status_code=401, detail="Invalid Google ID token")
+    except httpx.HTTPError:
+        raise HTTPException(
+            status_code=status.HTTP_502_BAD_GATEWAY,
+            detail="Failed to fetch Google certificates",
+        )
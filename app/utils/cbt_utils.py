@@ -0,0 +1,10 @@
+import struct
+from typing import Sequence, Tuple
+
+
+def pack_qna_ids(qna_ids: Sequence[int]) -> bytes:
+    return struct.pack(f"<{len(qna_ids)}I", *qna_ids)
+
+
+def unpack_qna_ids(manifest: bytes) -> Tuple[int, ...]:
+    return struct.unpack(f"<{len(manifest) // 4}I", manifest)
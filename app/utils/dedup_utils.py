@@ -0,0 +1,88 @@
+import re
+import zlib
+from collections import defaultdict
+from typing import Dict, List, Sequence
+import numpy as np
+
+SHINGLE_SIZE = 3
+NUM_PERM = 128
+LSH_BANDS = 16
+LSH_ROWS = NUM_PERM // LSH_BANDS
+# 추정 자카드 유사도가 이 값 이상이면 같은 문제로 본다.
+SIMILARITY_THRESHOLD = 0.8
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+_whitespace_reg = re.compile(r"\s+")
+
+# 실행할 때마다 같은 서명이 나오도록 순열 계수를 고정 시드로 만든다.
+# a, b, x가 모두 32비트 이하이므로 a * x + b는 uint64를 넘지 않는다.
+_rng = np.random.default_rng(20250701)
+_perm_a = _rng.integers(1, 1 << 32, size=(NUM_PERM, 1), dtype=np.uint64)
+_perm_b = _rng.integers(0, 1 << 32, size=(NUM_PERM, 1), dtype=np.uint64)
+
+
+def shingles(text: str, k: int = SHINGLE_SIZE) -> np.ndarray:
+    normalized = _whitespace_reg.sub("", text).casefold()
+    if len(normalized) < k:
+        normalized = normalized.ljust(k)
+    return np.unique(
+        np.fromiter(
+            (
+                zlib.crc32(normalized[i : i + k].encode())
+                for i in range(len(normalized) - k + 1)
+            ),
+            dtype=np.uint64,
+        )
+    )
+
+
+def minhash_signature(text: str) -> np.ndarray:
+    hashed = shingles(text)[None, :]
+    # (a * x + b) mod p 를 모든 순열에 대해 한꺼번에 계산한다.
+    permuted = (_perm_a * hashed + _perm_b) % _MERSENNE_PRIME
+    return (permuted & _MAX_HASH).min(axis=1).astype(np.uint32)
+
+
+class _UnionFind:
+    def __init__(self, n: int):
+        self.parent = list(range(n))
+
+    def find(self, x: int) -> int:
+        while self.parent[x] != x:
+            self.parent[x] = self.parent[self.parent[x]]
+            x = self.parent[x]
+        return x
+
+    def union(self, x: int, y: int):
+        root_x, root_y = self.find(x), self.find(y)
+        if root_x != root_y:
+            self.parent[max(root_x, root_y)] = min(root_x, root_y)
+
+
+def cluster_near_duplicates(ids: Sequence[int], texts: Sequence[str]) -> Dict[int, int]:
+    """
+    MinHash 서명을 LSH 밴드로 나눠 같은 버킷에 들어간 문제끼리만 비교한다.
+    버킷 안에서는 첫 문제와만 비교하므로 전체 비교 횟수는 문제 수에 비례한다.
+    반환값은 qna id -> 클러스터 id(클러스터에서 가장 작은 qna id).
+    """
+    if not ids:
+        return {}
+    order = np.argsort(np.asarray(ids))
+    ids = [ids[i] for i in order]
+    signatures = np.stack([minhash_signature(texts[i]) for i in order])
+    union_find = _UnionFind(len(ids))
+    for band in range(LSH_BANDS):
+        band_rows = signatures[:, band * LSH_ROWS : (band + 1) * LSH_ROWS]
+        buckets: Dict[bytes, List[int]] = defaultdict(list)
+        for row, band_signature in enumerate(band_rows):
+            buckets[band_signature.tobytes()].append(row)
+        for rows in buckets.values():
+            first = rows[0]
+            for row in rows[1:]:
+                if union_find.find(row) == union_find.find(first):
+                    continue
+                similarity = np.mean(signatures[first] == signatures[row])
+                if similarity >= SIMILARITY_THRESHOLD:
+                    union_find.union(first, row)
+    return {qna_id: ids[union_find.find(row)] for row, qna_id in enumerate(ids)}
@@ -0,0 +1,113 @@
+import asyncio
+import re
+import time
+from typing import Dict, Mapping, Optional
+import httpx
+from fastapi import HTTPException
+from google.auth import jwt as google_jwt
+from ..core.config import settings
+
+GOOGLE_ISSUERS = ("accounts.google.com", "https://accounts.google.com")
+# Cache-Control에 max-age가 없을 때 인증서를 믿는 시간
+DEFAULT_CERTS_MAX_AGE_SEC = 300
+# 모르는 kid가 와도 이 간격 안에는 인증서를 다시 받지 않는다(임의 kid로 매번 받게 만드는 것 방지).
+CERTS_MIN_REFRESH_SEC = 60
+ID_TOKEN_CLOCK_SKEW_SEC = 10
+
+_max_age_reg = re.compile(r"max-age=(\d+)")
+
+
+def certs_max_age(headers: Mapping[str, str]) -> int:
+    match = _max_age_reg.search(headers.get("cache-control", ""))
+    return int(match.group(1)) if match else DEFAULT_CERTS_MAX_AGE_SEC
+
+
+class GoogleOAuthClient:
+    """
+    구글 로그인 콜백에 쓰는 비동기 HTTP 클라이언트. 연결을 재사용하는 httpx.AsyncClient 하나를 공유하고,
+    ID 토큰 서명 인증서는 응답의 max-age 동안 메모리에 두고 로컬에서 검증한다.
+    클라이언트는 처음 쓸 때 만들고 lifespan 종료 시 aclose()로 닫는다.
+    """
+
+    def __init__(self, transport: Optional[httpx.AsyncBaseTransport] = None):
+        # 테스트에서 httpx.MockTransport 등으로 구글 대신 응답할 수 있다.
+        self.transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+        self._certs_lock: Optional[asyncio.Lock] = None
+        self._certs: Dict[str, str] = {}
+        self._certs_fetched_at = float("-inf")
+        self._certs_expire_at = float("-inf")
+
+    async def exchange_code(self, code: str) -> str:
+        response = await self._get_client().post(
+            settings.GOOGLE_TOKEN_URL,
+            data={
+                "code": code,
+                "client_id": settings.GOOGLE_CLIENT_ID,
+                "client_secret": settings.GOOGLE_CLIENT_SECRET,
+                "redirect_uri": settings.GOOGLE_REDIRECT_URI,
+                "grant_type": "authorization_code",
+            },
+        )
+        try:
+            token_data = response.json()
+        except ValueError:
+            token_data = {}
+        if "id_token" not in token_data:
+            raise HTTPException(
+                status_code=400, detail="ID token not found in response from Google"
+            )
+        return token_data["id_token"]
+
+    async def verify_id_token(self, id_token_jwt: str) -> Dict:
+        """
+        서명, aud(GOOGLE_CLIENT_ID), 만료, 발급자를 확인한다. 잘못된 토큰이면 ValueError.
+        """
+        kid = google_jwt.decode_header(id_token_jwt).get("kid")
+        certs = await self._get_certs()
+        if kid not in certs:
+            # 구글이 키를 교체했으면 캐시가 끝나기 전이라도 한 번 다시 받는다.
+            certs = await self._get_certs(refresh=True)
+        idinfo = google_jwt.decode(
+            id_token_jwt,
+            certs=certs,
+            audience=settings.GOOGLE_CLIENT_ID,
+            clock_skew_in_seconds=ID_TOKEN_CLOCK_SKEW_SEC,
+        )
+        if idinfo.get("iss") not in GOOGLE_ISSUERS:
+            raise ValueError(f"Wrong issuer: {idinfo.get('iss')}")
+        return idinfo
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+            self._certs_lock = None
+
+    async def _get_certs(self, refresh: bool = False) -> Dict[str, str]:
+        client = self._get_client()
+        if not refresh and time.monotonic() < self._certs_expire_at:
+            return self._certs
+        async with self._certs_lock:
+            now = time.monotonic()
+            if now < self._certs_expire_at and (
+                not refresh or now - self._certs_fetched_at < CERTS_MIN_REFRESH_SEC
+            ):
+                return self._certs
+            response = await client.get(settings.GOOGLE_CERTS_URL)
+            response.raise_for_status()
+            self._certs = response.json()
+            self._certs_fetched_at = now
+            self._certs_expire_at = now + certs_max_age(response.headers)
+        return self._certs
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=settings.GOOGLE_HTTP_TIMEOUT_SEC, transport=self.transport
+            )
+            self._certs_lock = asyncio.Lock()
+        return self._client
+
+
+google_oauth = GoogleOAuthClient()
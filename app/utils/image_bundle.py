@@ -0,0 +1,50 @@
+import hashlib
+import io
+import threading
+import zipfile
+from typing import Sequence, Tuple
+from cachetools import LRUCache
+from ..core.config import settings
+from .image_manifest import ImageFile
+
+
+def bundle_etag(members: Sequence[Tuple[str, ImageFile]]) -> str:
+    digest = hashlib.sha256()
+    for rel_path, image_file in members:
+        digest.update(f"{rel_path}\0{image_file.etag}\n".encode())
+    return f'"{digest.hexdigest()[:32]}"'
+
+
+def build_bundle(members: Sequence[Tuple[str, ImageFile]]) -> bytes:
+    # PNG는 이미 압축되어 있으므로 다시 압축하지 않고 그대로 담는다.
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_STORED) as zf:
+        for rel_path, image_file in members:
+            zf.write(image_file.path, arcname=rel_path)
+    return buffer.getvalue()
+
+
+class ImageBundleCache:
+    """
+    회차별 이미지 묶음(zip)을 ETag 기준으로 메모리에 보관한다. 전체 크기는
+    IMAGE_BUNDLE_CACHE_MB로 제한한다.
+    """
+
+    def __init__(self):
+        self._cache: LRUCache = LRUCache(
+            maxsize=settings.IMAGE_BUNDLE_CACHE_MB * 1024 * 1024, getsizeof=len
+        )
+        self._lock = threading.Lock()
+
+    def get(self, etag: str, members: Sequence[Tuple[str, ImageFile]]) -> bytes:
+        with self._lock:
+            bundle = self._cache.get(etag)
+        if bundle is None:
+            bundle = build_bundle(members)
+            with self._lock:
+                if len(bundle) <= self._cache.maxsize:
+                    self._cache[etag] = bundle
+        return bundle
+
+
+image_bundles = ImageBundleCache()
@@ -0,0 +1,124 @@
+import hashlib
+import os
+import threading
+import time
+from pathlib import Path, PurePosixPath
+from types import MappingProxyType
+from typing import Dict, FrozenSet, List, Mapping, NamedTuple, Optional
+from ..core.config import settings
+from .solve_utils import path_getter
+
+# 디렉토리 mtime을 다시 확인하기 전까지 기존 목록을 그대로 믿는 시간
+REVALIDATE_INTERVAL_SEC = 30.0
+
+
+class ImageFile(NamedTuple):
+    path: Path
+    etag: str
+    stat_result: os.stat_result
+
+
+class _ManifestEntry(NamedTuple):
+    mtime_ns: Optional[int]
+    checked_at: float
+    paths: Mapping[str, str]
+    allowed: FrozenSet[str]
+    # 처음 제공할 때 계산한 파일별 ETag. 파일의 mtime이나 크기가 바뀌면 다시 계산하고,
+    # 디렉토리를 다시 읽으면 함께 버려진다.
+    files: Dict[str, ImageFile]
+
+
+def _dir_mtime_ns(directory: str) -> Optional[int]:
+    try:
+        return (settings.BASE_PATH / directory).stat().st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+def _same_file(old: os.stat_result, new: os.stat_result) -> bool:
+    return (old.st_mtime_ns, old.st_size) == (new.st_mtime_ns, new.st_size)
+
+
+def _hash_file(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 64), b""):
+            digest.update(chunk)
+    return f'"{digest.hexdigest()[:32]}"'
+
+
+class ImageManifest:
+    """
+    회차 디렉토리별 이미지 마커 -> BASE_PATH 기준 상대 경로 색인.
+    디렉토리를 매 요청마다 glob하지 않고, mtime이 바뀐 경우에만 다시 읽는다.
+    """
+
+    def __init__(self):
+        self._entries: Dict[str, _ManifestEntry] = {}
+        self._lock = threading.Lock()
+
+    def build(self):
+        base_path = settings.BASE_PATH
+        for inning_dir in base_path.glob("*/*"):
+            if inning_dir.is_dir():
+                self._scan(inning_dir.relative_to(base_path).as_posix())
+
+    def all_files(self) -> List[str]:
+        return sorted(
+            path for entry in self._entries.values() for path in entry.allowed
+        )
+
+    def get(self, directory: str) -> Mapping[str, str]:
+        entry = self._get_entry(directory)
+        return entry.paths if entry else MappingProxyType({})
+
+    def get_file(self, rel_path: str) -> Optional[ImageFile]:
+        """
+        색인에 있는 이미지만 돌려준다. 목록에 없는 경로는 디스크를 보지 않고 None.
+        """
+        entry = self._get_entry(PurePosixPath(rel_path).parent.as_posix())
+        if entry is None or rel_path not in entry.allowed:
+            return None
+        path = settings.BASE_PATH / rel_path
+        try:
+            stat_result = path.stat()
+        except FileNotFoundError:
+            entry.files.pop(rel_path, None)
+            return None
+        image_file = entry.files.get(rel_path)
+        # 같은 이름으로 덮어쓰면 디렉토리 mtime은 그대로이므로 파일 자체의 stat을 매번 비교한다.
+        if image_file is None or not _same_file(image_file.stat_result, stat_result):
+            image_file = ImageFile(path, _hash_file(path), stat_result)
+            entry.files[rel_path] = image_file
+        return image_file
+
+    def _get_entry(self, directory: str) -> Optional[_ManifestEntry]:
+        entry = self._entries.get(directory)
+        if entry is None:
+            return self._scan(directory)
+        now = time.monotonic()
+        if now - entry.checked_at < REVALIDATE_INTERVAL_SEC:
+            return entry
+        mtime_ns = _dir_mtime_ns(directory)
+        if mtime_ns != entry.mtime_ns:
+            return self._scan(directory)
+        entry = entry._replace(checked_at=now)
+        self._entries[directory] = entry
+        return entry
+
+    def _scan(self, directory: str) -> Optional[_ManifestEntry]:
+        with self._lock:
+            mtime_ns = _dir_mtime_ns(directory)
+            if mtime_ns is None:
+                # 없는 디렉토리는 색인에 남기지 않는다.
+                self._entries.pop(directory, None)
+                return None
+            paths = MappingProxyType(path_getter(directory))
+            entry = _ManifestEntry(
+                mtime_ns, time.monotonic(), paths, frozenset(paths.values()), {}
+            )
+            self._entries[directory] = entry
+        return entry
+
+
+image_manifest = ImageManifest()
@@ -0,0 +1,134 @@
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Optional
+from PIL import Image
+from ..core.config import settings
+from .image_manifest import ImageFile
+
+# 변형 이미지 수가 요청 파라미터만큼 늘어나지 않도록 너비는 이 값들 중 하나로 맞춘다.
+VARIANT_WIDTHS = (320, 480, 640, 960, 1280)
+VARIANT_MEDIA_TYPES = {"png": "image/png", "webp": "image/webp"}
+# scripts/prewarmimages.py가 미리 만들어 두는 조합
+PREWARM_VARIANTS = ((480, "webp"), (960, "webp"))
+
+
+def snap_width(width: Optional[int]) -> Optional[int]:
+    if width is None:
+        return None
+    return next((w for w in VARIANT_WIDTHS if w >= width), VARIANT_WIDTHS[-1])
+
+
+def variant_key(image_file: ImageFile, width: Optional[int], fmt: str) -> str:
+    source_hash = image_file.etag.strip('"')
+    return f"{source_hash}-{width or 0}-{fmt}"
+
+
+def render_variant(src: str, dst: str, width: Optional[int], fmt: str):
+    """
+    워커 프로세스에서 실행된다. 임시 파일에 쓴 뒤 이름을 바꿔 반쯤 쓴 파일이 보이지 않게 한다.
+    """
+    with Image.open(src) as img:
+        if width and img.width > width:
+            height = max(1, round(img.height * width / img.width))
+            img = img.resize((width, height), Image.Resampling.LANCZOS)
+        tmp = f"{dst}.{os.getpid()}.tmp"
+        if fmt == "webp":
+            if img.mode not in ("RGB", "RGBA"):
+                img = img.convert("RGBA")
+            img.save(tmp, "WEBP", quality=80, method=4)
+        else:
+            img.save(tmp, "PNG", optimize=True)
+    os.replace(tmp, dst)
+
+
+class ImageVariantCache:
+    """
+    원본 해시와 파라미터로 이름 붙인 변형 이미지를 디스크에 두고, 용량을 넘으면
+    가장 오래 쓰이지 않은(mtime 기준) 파일부터 지운다.
+    """
+
+    def __init__(self):
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._pending: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._size: Optional[int] = None
+
+    @property
+    def cache_dir(self) -> Path:
+        return settings.IMAGE_VARIANT_CACHE_PATH
+
+    def get(self, image_file: ImageFile, width: Optional[int], fmt: str) -> Path:
+        name = f"{variant_key(image_file, width, fmt)}.{fmt}"
+        path = self.cache_dir / name
+        try:
+            os.utime(path)  # LRU 순서를 위해 사용 시각을 갱신
+            return path
+        except FileNotFoundError:
+            pass
+
+        with self._lock:
+            future = self._pending.get(name)
+            is_owner = future is None
+            if is_owner:
+                self.cache_dir.mkdir(parents=True, exist_ok=True)
+                future = self._get_executor().submit(
+                    render_variant, str(image_file.path), str(path), width, fmt
+                )
+                self._pending[name] = future
+        try:
+            future.result()
+        finally:
+            if is_owner:
+                with self._lock:
+                    self._pending.pop(name, None)
+        if is_owner:
+            self._account(path.stat().st_size)
+        return path
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=settings.IMAGE_VARIANT_WORKERS
+            )
+        return self._executor
+
+    def _cached_files(self):
+        files = []
+        for p in self.cache_dir.iterdir():
+            if p.suffix == ".tmp":
+                continue
+            try:
+                st = p.stat()
+            except FileNotFoundError:
+                continue
+            files.append((st.st_mtime, st.st_size, p))
+        return files
+
+    def _account(self, added: int):
+        max_bytes = settings.IMAGE_VARIANT_CACHE_MAX_MB * 1024 * 1024
+        with self._lock:
+            if self._size is None:
+                self._size = sum(size for _, size, _ in self._cached_files())
+            else:
+                self._size += added
+            if self._size <= max_bytes:
+                return
+            # 한 번 넘칠 때마다 여유를 두고 80%까지 줄인다.
+            for _, size, victim in sorted(self._cached_files()):
+                if self._size <= max_bytes * 0.8:
+                    break
+                try:
+                    victim.unlink()
+                except FileNotFoundError:
+                    continue
+                self._size -= size
+
+
+image_variants = ImageVariantCache()
@@ -0,0 +1,62 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple
+from fastapi import HTTPException, status
+from ..core.config import settings
+from ..core.security import pwd_context
+
+
+class PasswordHasher:
+    """
+    bcrypt 해시/검증을 전용 스레드 풀에서 돌려 이벤트 루프를 막지 않는다(bcrypt는 GIL을 놓는다).
+    실행 중인 것과 대기 중인 것을 합쳐 PASSWORD_HASH_MAX_PENDING개를 넘으면 줄을 세우지 않고 바로 503으로 거절한다.
+    """
+
+    def __init__(self):
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    async def hash(self, password: str) -> str:
+        return await self._run(pwd_context.hash, password)
+
+    async def verify_and_update(
+        self, password: str, hashed_password: str
+    ) -> Tuple[bool, Optional[str]]:
+        """
+        비밀번호가 맞고 해시 설정(라운드 수 등)이 바뀌었으면 새 해시도 함께 돌려준다.
+        """
+        return await self._run(pwd_context.verify_and_update, password, hashed_password)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    async def _run(self, fn, *args):
+        with self._lock:
+            if self._pending >= settings.PASSWORD_HASH_MAX_PENDING:
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Too many sign-in requests, try again shortly",
+                    headers={"Retry-After": "1"},
+                )
+            self._pending += 1
+            executor = self._get_executor()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(executor, fn, *args)
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=settings.PASSWORD_HASH_WORKERS,
+                thread_name_prefix="password-hash",
+            )
+        return self._executor
+
+
+password_hasher = PasswordHasher()
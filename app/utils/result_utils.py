@@ -1,114 +1,117 @@
+import base64
 import re
 from collections import defaultdict
-from typing import Sequence, Tuple, List, Dict, Union, Any, Optional
-from ..models import GichulSubject, ResultSet, GichulSetType
-from ..schemas import ManyResults, ResultSetWithResult, ResultSetResponse
-from .solve_utils import dir_maker, path_getter, attach_image_paths
+from typing import Sequence, Tuple, List, Dict, Union, Any, Optional, Mapping
+import numpy as np
+from ..models import ExamChoice, GichulSubject, ResultSet, GichulSetType
+from ..schemas import (
+    ManyResults,
+    ResultSetWithResult,
+    ResultSetResponse,
+    QnaWithImgPaths,
+)
 
+# 정답표에 쓰는 보기 번호. 0은 정답을 모르는 문제(또는 고르지 않은 답)를 뜻한다.
+CHOICE_CODES = {choice.value: code for code, choice in enumerate(ExamChoice, start=1)}
+SUBJECTS = tuple(GichulSubject)
+SUBJECT_CODES = {subject: code for code, subject in enumerate(SUBJECTS)}
+# (과목, 문제 수, 맞힌 수). 채점 쿼리와 AnswerKey.score가 이 모양으로 돌려준다.
+SubjectCount = Tuple[GichulSubject, int, int]
+
+
+def is_wrong_answer(row: Mapping[str, Any]) -> bool:
+    # 답을 고르고 틀린 풀이만 오답노트에 남긴다.
+    return not row["correct"] and row["choice"] is not None
 
-def check_if_passed(
-    sample_gichulset_type: GichulSetType,
-    subject_scores=Dict[Any, Dict[str, Union[int, bool]]],
-):
-    # defaultdict({<GichulSubject.hanghae: '항해'>: {'question_counts': 25, 'correct_counts': 4}, <GichulSubject.unyong: '운용'>: {'question_counts': 25, 'correct_counts': 0}, <GichulSubject.beopgyu: '법규'>: {'question_counts': 25, 'correct_counts': 1}, <GichulSubject.english: '영어'>: {'question_counts': 25, 'correct_counts': 0}, <GichulSubject.sangseon: '상선전문'>: {'question_counts': 25, 'correct_counts': 0}})
-    data = [
-        (value_dict["question_counts"], value_dict["correct_counts"])
-        for value_dict in subject_scores.values()
-    ]
-    total_amount, total_score = tuple(sum(group) for group in zip(*data))
-    for subject, contents in subject_scores.items():
-        if (
-            sample_gichulset_type == GichulSetType.hanghaesa
-            and subject == GichulSubject.beopgyu
-        ):
-            contents["passed"] = contents["correct_counts"] >= 15
-        else:
-            contents["passed"] = contents["correct_counts"] >= 10
-    passed = True
-    if any(not v["passed"] for v in subject_scores.values()):
-        passed = False
-    elif total_score / len(subject_scores) < 15:
-        passed = False
-    return total_amount, total_score, passed, subject_scores
 
+class AnswerKey:
+    """
+    gichulqna_id를 인덱스로 하는 보기 번호/과목 배열. 제출된 답안 전체를 한 번에 채점한다.
+    """
 
-def score_answers(
-    resultset: ResultSet, is_used_in_mypage: bool = None
-) -> Tuple[Optional[int], Dict[Any, Dict[str, Union[int, bool]]]]:
-    resultset_dict = ResultSetResponse.model_validate(resultset).model_dump()
-    if not is_used_in_mypage:
-        sample_gichulset_id: int = resultset_dict["results"][0]["gichul_qna"][
-            "gichulset_id"
+    def __init__(self, qnas: Mapping[int, Any]):
+        size = max(qnas, default=0) + 1
+        self.codes = np.zeros(size, dtype=np.uint8)
+        self.subject_codes = np.zeros(size, dtype=np.uint8)
+        for qna_id, qna in qnas.items():
+            self.codes[qna_id] = CHOICE_CODES.get((qna.answer or "").strip(), 0)
+            self.subject_codes[qna_id] = SUBJECT_CODES[qna.subject]
+
+    def grade(
+        self, qna_ids: Sequence[int], choices: Sequence[Optional[str]]
+    ) -> np.ndarray:
+        ids = np.asarray(qna_ids, dtype=np.int64)
+        chosen = np.fromiter(
+            (CHOICE_CODES.get(choice, 0) for choice in choices),
+            dtype=np.uint8,
+            count=len(ids),
+        )
+        known = (ids >= 0) & (ids < len(self.codes))
+        expected = np.zeros(len(ids), dtype=np.uint8)
+        expected[known] = self.codes[ids[known]]
+        return (expected != 0) & (expected == chosen)
+
+    def score(
+        self, qna_ids: Sequence[int], choices: Sequence[Optional[str]]
+    ) -> Tuple[np.ndarray, List[SubjectCount]]:
+        """
+        채점 결과와 과목별 (과목, 문제 수, 맞힌 수)를 DB를 읽지 않고 만든다.
+        qna_ids는 모두 정답표에 있는 문제여야 한다.
+        """
+        corrects = self.grade(qna_ids, choices)
+        subjects = self.subject_codes[np.asarray(qna_ids, dtype=np.int64)]
+        question_counts = np.bincount(subjects, minlength=len(SUBJECTS))
+        correct_counts = np.bincount(subjects, weights=corrects, minlength=len(SUBJECTS))
+        # 과목 순서는 제출된 순서(처음 나온 위치)를 따른다.
+        _, first_seen = np.unique(subjects, return_index=True)
+        subject_counts = [
+            (SUBJECTS[code], int(question_counts[code]), int(correct_counts[code]))
+            for code in subjects[np.sort(first_seen)].tolist()
         ]
-    subject_scores = defaultdict(
-        lambda: {"question_counts": 0, "correct_counts": 0, "passed": False}
-    )
-    for result in resultset_dict["results"]:
-        result_subject = result["gichul_qna"]["subject"]
-        subject_scores[result_subject]["question_counts"] += 1
-        if result["correct"]:
-            subject_scores[result_subject]["correct_counts"] += 1
-    if is_used_in_mypage:
-        return subject_scores
-    return sample_gichulset_id, subject_scores
+        return corrects, subject_counts
 
 
-def leave_the_latest_qnas(
-    odapsets: Sequence[ResultSet],
-) -> List[Dict[str, Union[str, int, Dict[str, Union[str, int]]]]]:
-    qna_to_gichulset_map = {}
-    for odapset in odapsets:
-        for result in odapset.results:
-            if result.gichul_qna and result.gichul_qna.gichulset:
-                qna_to_gichulset_map[result.gichul_qna.id] = result.gichul_qna.gichulset
-    odapsets_data = [
-        ResultSetWithResult.model_validate(odapset).model_dump() for odapset in odapsets
-    ]
-    unique_qnas = {}
-    attempts_counts = defaultdict(int)
-    for odapset_dict in odapsets_data:
-        for result_dict in odapset_dict["results"]:
-            if result_dict["hidden"] or result_dict["correct"]:
-                continue
-            if not result_dict["choice"]:
-                continue
-            qna_dict = result_dict["gichul_qna"]
-            qna_id = qna_dict["id"]
-            attempts_counts[qna_id] += 1
-            if qna_id not in unique_qnas:
-                unique_qnas[qna_id] = qna_dict
-                if qna_id in qna_to_gichulset_map:
-                    gichulset = qna_to_gichulset_map[qna_id]
-                    unique_qnas[qna_id]["gichulset"] = {
-                        "year": gichulset.year,
-                        "type": gichulset.type,
-                        "grade": gichulset.grade,
-                        "inning": gichulset.inning,
-                    }
-                unique_qnas[qna_id]["choice"] = result_dict["choice"]
-                unique_qnas[qna_id]["result_id"] = result_dict["id"]
-                unique_qnas[qna_id]["hidden"] = result_dict["hidden"]
-    return [
-        {**qna_dict, "attempt_counts": attempts_counts[qna_id]}
-        for qna_id, qna_dict in unique_qnas.items()
-    ]
+def encode_cursor(key: int, kind: str = "rs") -> str:
+    """
+    마이페이지 페이지네이션 커서. 클라이언트에는 의미 없는 문자열로 보이게 한다.
+    kind는 커서가 가리키는 키(rs: resultset id, od: 오답 result id)를 구분한다.
+    """
+    return base64.urlsafe_b64encode(f"{kind}:{key}".encode()).decode().rstrip("=")
 
 
-def append_imgPaths(unique_qnas: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-    path_cache = {}
-    for qna_dict in unique_qnas:
-        gichulset = qna_dict.get("gichulset")
-        if not gichulset:
-            continue
+def decode_cursor(cursor: str, kind: str = "rs") -> Optional[int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+    except (ValueError, UnicodeDecodeError):
+        return None
+    prefix, _, value = raw.partition(":")
+    if prefix != kind or not value.isdigit():
+        return None
+    return int(value)
 
-        gichulset_id = gichulset.get("id")
-        if gichulset_id and gichulset_id not in path_cache:
-            directory = dir_maker(
-                year=str(gichulset["year"]),
-                license=gichulset["type"],
-                level=gichulset["grade"],
-                round=gichulset["inning"],
-            )
-            path_cache[gichulset_id] = path_getter(directory)
 
-    return attach_image_paths(unique_qnas, path_cache)
+def check_if_passed(
+    sample_gichulset_type: GichulSetType,
+    subject_counts: Sequence[SubjectCount],
+) -> Tuple[int, int, bool, Dict[GichulSubject, Dict[str, Union[int, bool]]]]:
+    subject_scores = {}
+    for subject, question_counts, correct_counts in subject_counts:
+        pass_line = (
+            15
+            if sample_gichulset_type == GichulSetType.hanghaesa
+            and subject == GichulSubject.beopgyu
+            else 10
+        )
+        subject_scores[subject] = {
+            "question_counts": question_counts,
+            "correct_counts": correct_counts,
+            "passed": correct_counts >= pass_line,
+        }
+    total_amount = sum(scores["question_counts"] for scores in subject_scores.values())
+    total_score = sum(scores["correct_counts"] for scores in subject_scores.values())
+    passed = True
+    if any(not v["passed"] for v in subject_scores.values()):
+        passed = False
+    elif total_score / len(subject_scores) < 15:
+        passed = False
+    return total_amount, total_score, passed, subject_scores
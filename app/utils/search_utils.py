@@ -0,0 +1,168 @@
+import math
+import re
+from collections import Counter
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+
+NGRAM_SIZE = 2
+BM25_K1 = 1.2
+BM25_B = 0.75
+# 유사 문제 TF-IDF에서 이 비율보다 많은 문제에 나오는 n-gram은 변별력이 없어 버린다.
+TFIDF_MAX_DF = 0.5
+# 문제 수와 상관없이 이보다 많은 문제에 나오는 n-gram도 버린다. 드문 n-gram을 공유하는 문제만
+# 후보가 되므로 문제 하나의 이웃 계산이 전체 문제 수에 비례하지 않는다.
+TFIDF_MAX_POSTINGS = 64
+
+SEARCH_TEXT_FIELDS = ("questionstr", "ex1str", "ex2str", "ex3str", "ex4str")
+
+_non_word_reg = re.compile(r"[^\w]+")
+
+
+def qna_search_text(qna) -> str:
+    return " ".join(getattr(qna, key) or "" for key in SEARCH_TEXT_FIELDS)
+
+
+def char_ngrams(text: str, n: int = NGRAM_SIZE) -> List[str]:
+    """
+    한국어는 띄어쓰기와 조사가 일정하지 않으므로 단어가 아니라 어절 안의 글자 n-gram으로 색인한다.
+    n보다 짧은 어절은 그대로 하나의 토큰으로 쓴다.
+    """
+    grams = []
+    for token in _non_word_reg.split(text.casefold()):
+        if not token:
+            continue
+        if len(token) < n:
+            grams.append(token)
+            continue
+        grams.extend(token[i : i + n] for i in range(len(token) - n + 1))
+    return grams
+
+
+class NgramIndex:
+    """
+    글자 n-gram 역색인. 각 n-gram의 포스팅마다 BM25 가중치를 미리 계산해 두어
+    검색 시에는 포스팅 배열을 더하기만 한다.
+    """
+
+    def __init__(self, doc_ids: Sequence[int], texts: Sequence[str]):
+        self.doc_ids = np.asarray(doc_ids, dtype=np.int64)
+        doc_grams = [Counter(char_ngrams(text)) for text in texts]
+        lengths = np.array([sum(grams.values()) for grams in doc_grams], dtype=float)
+        avg_length = lengths.mean() if len(lengths) and lengths.mean() > 0 else 1.0
+
+        rows_by_gram: Dict[str, List[int]] = {}
+        tfs_by_gram: Dict[str, List[int]] = {}
+        for row, grams in enumerate(doc_grams):
+            for gram, tf in grams.items():
+                rows_by_gram.setdefault(gram, []).append(row)
+                tfs_by_gram.setdefault(gram, []).append(tf)
+
+        n_docs = len(texts)
+        self.postings: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        for gram, rows in rows_by_gram.items():
+            rows_arr = np.asarray(rows, dtype=np.int32)
+            tfs = np.asarray(tfs_by_gram[gram], dtype=float)
+            df = len(rows)
+            idf = math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+            norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths[rows_arr] / avg_length)
+            weights = idf * tfs * (BM25_K1 + 1) / (tfs + norm)
+            self.postings[gram] = (rows_arr, weights)
+
+    def search(self, query: str, limit: int) -> List[Tuple[int, float]]:
+        scores = np.zeros(len(self.doc_ids))
+        for gram in set(char_ngrams(query)):
+            posting = self.postings.get(gram)
+            if posting is None:
+                continue
+            rows, weights = posting
+            scores[rows] += weights
+        matched = np.flatnonzero(scores)
+        if len(matched) > limit:
+            matched = matched[np.argpartition(-scores[matched], limit - 1)[:limit]]
+        ranked = matched[np.argsort(-scores[matched], kind="stable")]
+        return [(int(self.doc_ids[row]), float(scores[row])) for row in ranked]
+
+
+def tfidf_neighbors(
+    doc_ids: Sequence[int],
+    texts: Sequence[str],
+    k: int,
+    groups: Optional[Sequence[int]] = None,
+) -> Dict[int, Tuple[Tuple[int, float], ...]]:
+    """
+    글자 n-gram TF-IDF 벡터(L2 정규화)의 코사인 유사도로 문서마다 상위 k개 이웃을 구한다.
+    행렬은 CSR(문서 -> n-gram)과 CSC(n-gram -> 문서) 배열로만 들고, 문서마다 자기 n-gram 열에
+    나오는 후보 문서만 모아 내적을 더한다.
+    groups가 주어지면 같은 그룹 값을 가진 문서는 이웃에서 뺀다(같은 유사 문제 클러스터 등).
+    """
+    n_docs = len(texts)
+    if n_docs == 0:
+        return {}
+    vocab: Dict[str, int] = {}
+    rows, cols, tfs = [], [], []
+    for row, text in enumerate(texts):
+        for gram, tf in Counter(char_ngrams(text)).items():
+            rows.append(row)
+            cols.append(vocab.setdefault(gram, len(vocab)))
+            tfs.append(tf)
+    rows = np.asarray(rows, dtype=np.int64)
+    cols = np.asarray(cols, dtype=np.int64)
+    tfs = np.asarray(tfs, dtype=float)
+
+    df = np.bincount(cols, minlength=len(vocab))
+    if n_docs > 1:
+        max_df = min(max(1, int(TFIDF_MAX_DF * n_docs)), TFIDF_MAX_POSTINGS)
+        keep = df[cols] <= max_df
+        rows, cols, tfs = rows[keep], cols[keep], tfs[keep]
+    idf = np.log((1 + n_docs) / (1 + df)) + 1
+    weights = (1 + np.log(tfs)) * idf[cols]
+    norms = np.sqrt(np.bincount(rows, weights=weights**2, minlength=n_docs))
+    norms[norms == 0] = 1.0
+    weights /= norms[rows]
+
+    # rows는 이미 정렬되어 있으므로 그대로 CSR이 된다.
+    csr_indptr = np.searchsorted(rows, np.arange(n_docs + 1))
+    order = np.argsort(cols, kind="stable")
+    csc_rows, csc_weights = rows[order], weights[order]
+    csc_indptr = np.searchsorted(cols[order], np.arange(len(vocab) + 1))
+
+    # 그룹 값으로 정렬해 두고, 문서마다 같은 그룹 문서를 이진 탐색으로 찾는다.
+    group_arr = (
+        np.arange(n_docs) if groups is None else np.asarray(groups, dtype=np.int64)
+    )
+    group_order = np.argsort(group_arr, kind="stable")
+    sorted_groups = group_arr[group_order]
+    neighbors: Dict[int, Tuple[Tuple[int, float], ...]] = {}
+    for row in range(n_docs):
+        start, end = csr_indptr[row], csr_indptr[row + 1]
+        doc_cols, doc_weights = cols[start:end], weights[start:end]
+        col_starts = csc_indptr[doc_cols]
+        lengths = csc_indptr[doc_cols + 1] - col_starts
+        # 열마다 다른 길이의 CSC 구간을 한 번에 이어 붙이기 위한 인덱스
+        offsets = np.repeat(col_starts - np.cumsum(lengths) + lengths, lengths)
+        gathered = offsets + np.arange(lengths.sum())
+        candidates, inverse = np.unique(csc_rows[gathered], return_inverse=True)
+        scores = np.bincount(
+            inverse,
+            weights=csc_weights[gathered] * np.repeat(doc_weights, lengths),
+            minlength=len(candidates),
+        )
+        # 자기 자신과 같은 그룹 문서를 뺀다. candidates는 정렬되어 있다.
+        group = group_arr[row]
+        excluded = group_order[
+            np.searchsorted(sorted_groups, group) : np.searchsorted(
+                sorted_groups, group, side="right"
+            )
+        ]
+        positions = np.searchsorted(candidates, excluded)
+        found = positions < len(candidates)
+        positions, excluded = positions[found], excluded[found]
+        scores[positions[candidates[positions] == excluded]] = 0.0
+        matched = np.flatnonzero(scores > 0)
+        if len(matched) > k:
+            matched = matched[np.argpartition(-scores[matched], k - 1)[:k]]
+        ranked = matched[np.argsort(-scores[matched], kind="stable")]
+        neighbors[int(doc_ids[row])] = tuple(
+            (int(doc_ids[candidates[r]]), round(float(scores[r]), 4)) for r in ranked
+        )
+    return neighbors
@@ -1,4 +1,4 @@
-from typing import Dict, Any, List
+from typing import Dict, List, Mapping, Optional, Set
 from ..core.config import settings
 from ..models import (
     GichulQna,
@@ -8,6 +8,9 @@ from ..models import (
 )
 import re
 
+PIC_MARKER_REG = re.compile(r"@(\w+)")
+IMG_TEXT_FIELDS = ("questionstr", "ex1str", "ex2str", "ex3str", "ex4str")
+
 
 def dir_maker(
     year: str, license: GichulSetType, level: GichulSetGrade, round: GichulSetInning
@@ -47,30 +50,22 @@ def path_getter(directory: str) -> Dict[str, str]:
     return path_dict
 
 
-def attach_image_paths(
-    qna_dicts: List[Dict], path_cache: Dict[int, Dict[str, str]]
-) -> List[Dict[str, Any]]:
-    pic_marker_reg = re.compile(r"@(\w+)")
+def find_image_markers(qna: GichulQna) -> Set[str]:
+    full_text = " ".join(getattr(qna, key) or "" for key in IMG_TEXT_FIELDS)
+    return {marker.lower() for marker in PIC_MARKER_REG.findall(full_text)}
 
-    for qna_dict in qna_dicts:
-        gichulset_id = qna_dict.get("gichulset_id")
-        if not gichulset_id or gichulset_id not in path_cache:
-            continue
 
-        image_map_for_set = path_cache[gichulset_id]
-        full_text = " ".join(
-            str(qna_dict.get(key, ""))
-            for key in ["questionstr", "ex1str", "ex2str", "ex3str", "ex4str"]
-        )
-        found_pic_markers = pic_marker_reg.findall(full_text)
+def resolve_image_paths(
+    markers: Set[str], image_map: Mapping[str, str]
+) -> Optional[List[str]]:
+    img_paths = sorted({image_map[marker] for marker in markers if marker in image_map})
+    return img_paths or None
 
-        if found_pic_markers:
-            img_paths = [
-                image_map_for_set[marker.lower()]
-                for marker in found_pic_markers
-                if marker.lower() in image_map_for_set
-            ]
-            if img_paths:
-                qna_dict["imgPaths"] = sorted(list(set(img_paths)))
 
-    return qna_dicts
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return etag.removeprefix("W/") in candidates
@@ -0,0 +1,91 @@
+import threading
+from typing import Optional
+from cachetools import TTLCache
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session as OrmSession, make_transient_to_detached, object_session
+from sqlmodel import Session
+from ..core.config import settings
+from ..crud import user_crud
+from ..models import User
+
+# 커밋 뒤에 한 번 더 무효화할 토큰 subject를 세션에 모아 두는 키
+_PENDING_INVALIDATIONS = "user_cache_invalidations"
+
+
+def _detached_copy(user: User) -> User:
+    # 요청 세션과 분리된 복사본을 보관하고, 꺼낼 때마다 merge로 요청 세션에 붙인다.
+    snapshot = User(**user.model_dump())
+    make_transient_to_detached(snapshot)
+    return snapshot
+
+
+class UserCache:
+    """
+    토큰 subject(username) -> 검증된 사용자. 인증이 필요한 요청마다 사용자를 다시 읽지 않는다.
+    USER_CACHE_MAX_USERS개까지 LRU로 보관하고, USER_CACHE_TTL_SEC가 지나면 다시 읽는다.
+    ORM으로 사용자를 수정/삭제하면 이 프로세스의 항목은 바로 지워진다. 다른 프로세스나
+    DB를 직접 고친 경우에는 TTL이 지나야 반영된다.
+    """
+
+    def __init__(self):
+        self._cache: TTLCache = TTLCache(
+            maxsize=settings.USER_CACHE_MAX_USERS, ttl=settings.USER_CACHE_TTL_SEC
+        )
+        self._lock = threading.Lock()
+        # 읽는 도중 무효화가 일어났으면 읽은 값을 캐시에 넣지 않는다.
+        self._generation = 0
+
+    def get(self, subject: str, user_id: Optional[int], db: Session) -> Optional[User]:
+        with self._lock:
+            cached = self._cache.get(subject)
+            generation = self._generation
+        if cached is not None:
+            return db.merge(cached, load=False)
+        if user_id is not None:
+            user = db.get(User, user_id)
+        else:
+            # uid 클레임이 없는 예전 토큰
+            user = user_crud.read_one_user(subject, db)
+        if user is None or user.username != subject:
+            return None
+        snapshot = _detached_copy(user)
+        with self._lock:
+            if generation == self._generation:
+                self._cache[subject] = snapshot
+        return user
+
+    def invalidate(self, subject: str):
+        with self._lock:
+            self._cache.pop(subject, None)
+            self._generation += 1
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+            self._generation += 1
+
+
+user_cache = UserCache()
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_user(mapper, connection, target: User):
+    subjects = {target.username, *inspect(target).attrs.username.history.deleted}
+    for subject in subjects:
+        user_cache.invalidate(subject)
+    # 커밋 전에 다른 요청이 예전 값을 다시 캐시할 수 있으므로 커밋 뒤에 한 번 더 지운다.
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault(_PENDING_INVALIDATIONS, set()).update(subjects)
+
+
+@event.listens_for(OrmSession, "after_commit")
+def _invalidate_committed_users(session: OrmSession):
+    for subject in session.info.pop(_PENDING_INVALIDATIONS, ()):
+        user_cache.invalidate(subject)
+
+
+@event.listens_for(OrmSession, "after_rollback")
+def _discard_pending_invalidations(session: OrmSession):
+    session.info.pop(_PENDING_INVALIDATIONS, None)
@@ -4,19 +4,22 @@ from typing import Optional, Dict
 from sqlmodel import Session
 from fastapi.security import OAuth2PasswordRequestForm
 from ..crud import user_crud
-from ..core.security import pwd_context, SECRET_KEY, ALGORITHM
+from ..core.security import SECRET_KEY, ALGORITHM
+from .password_hasher import password_hasher
 
 
-def verify_password(plain_password_from_front: str, hashed_password: str):
-    return pwd_context.verify(plain_password_from_front, hashed_password)
-
-
-def authenticate_user(form_data: OAuth2PasswordRequestForm, db: Session):
+async def authenticate_user(form_data: OAuth2PasswordRequestForm, db: Session):
     db_user = user_crud.read_one_user(form_data.username, db)
-    if not db_user:
+    if not db_user or not db_user.hashed_password:
         return False
-    if not verify_password(form_data.password, db_user.hashed_password):
+    verified, new_hash = await password_hasher.verify_and_update(
+        form_data.password, db_user.hashed_password
+    )
+    if not verified:
         return False
+    if new_hash is not None:
+        # 해시 설정이 바뀌었으면 로그인한 김에 새 설정으로 다시 저장한다.
+        db_user.hashed_password = new_hash
     return db_user
 
 
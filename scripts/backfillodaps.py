@@ -0,0 +1,30 @@
+import sys
+import os
+
+# 프로젝트 루트를 sys.path에 추가
+sys.path.append(os.path.dirname(os.path.abspath(os.path.dirname(__file__))))
+
+from sqlalchemy.engine import Engine
+from sqlmodel import Session
+from app.database import engine
+from app.crud import user_odap_crud
+
+
+def backfill_user_odaps(db_engine: Engine) -> int:
+    """
+    기존 풀이 기록(result)으로 user_odap 테이블을 다시 만듭니다.
+    migrate.py로 테이블을 만든 뒤 한 번 실행합니다. 이후에는 저장/숨김 시 자동으로 갱신됩니다.
+    """
+    with Session(db_engine) as session:
+        total = user_odap_crud.rebuild_user_odaps(session)
+        session.commit()
+    return total
+
+
+def main():
+    total = backfill_user_odaps(engine)
+    print(f"완료: 오답노트 {total}개를 기록했습니다.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+import sys
+import os
+
+# 프로젝트 루트를 sys.path에 추가
+sys.path.append(os.path.dirname(os.path.abspath(os.path.dirname(__file__))))
+
+from sqlalchemy.engine import Engine
+from sqlmodel import Session
+from app.database import engine
+from app.crud import resultset_crud
+from app.services.result import materialize_subject_scores
+
+BATCH_SIZE = 200
+
+
+def backfill_subject_scores(db_engine: Engine) -> int:
+    """
+    resultset_subject_score가 없는 기존 시험 결과를 채점해 과목별 점수를 기록합니다.
+    migrate.py로 테이블을 만든 뒤 한 번 실행합니다. 실행하지 않아도 마이페이지를 처음 열 때 채워집니다.
+    """
+    total = 0
+    while True:
+        with Session(db_engine) as session:
+            resultsets = resultset_crud.read_unscored_resultsets_for_score(
+                session, limit=BATCH_SIZE
+            )
+            if not resultsets:
+                return total
+            total += materialize_subject_scores(resultsets, session)
+        print(f"{total}개 세션 기록")
+
+
+def main():
+    total = backfill_subject_scores(engine)
+    print(f"완료: {total}개 세션의 과목별 점수를 기록했습니다.")
+
+
+if __name__ == "__main__":
+    main()
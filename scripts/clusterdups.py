@@ -0,0 +1,50 @@
+import sys
+import os
+
+# 프로젝트 루트를 sys.path에 추가
+sys.path.append(os.path.dirname(os.path.abspath(os.path.dirname(__file__))))
+
+import time
+from sqlalchemy import bindparam, update
+from sqlalchemy.engine import Engine
+from sqlmodel import Session, select
+from app.database import engine
+from app.models import GichulQna
+from app.services.question_bank import request_question_bank_reload
+from app.utils.dedup_utils import cluster_near_duplicates
+from app.utils.search_utils import qna_search_text
+
+
+def update_cluster_ids(db_engine: Engine) -> int:
+    """
+    모든 기출문제의 MinHash 서명을 계산해 거의 같은 문제끼리 묶고 cluster_id를 저장합니다.
+    반환값은 두 문제 이상이 묶인 클러스터 수입니다.
+    """
+    with Session(db_engine) as session:
+        qnas = session.exec(select(GichulQna)).all()
+        cluster_ids = cluster_near_duplicates(
+            [qna.id for qna in qnas], [qna_search_text(qna) for qna in qnas]
+        )
+        session.connection().execute(
+            update(GichulQna.__table__)
+            .where(GichulQna.__table__.c.id == bindparam("qna_id"))
+            .values(cluster_id=bindparam("new_cluster_id")),
+            [
+                {"qna_id": qna_id, "new_cluster_id": cluster_id}
+                for qna_id, cluster_id in cluster_ids.items()
+            ],
+        )
+        session.commit()
+    duplicated = {
+        cluster_id for qna_id, cluster_id in cluster_ids.items() if qna_id != cluster_id
+    }
+    return len(duplicated)
+
+
+if __name__ == "__main__":
+    start = time.time()
+    cluster_count = update_cluster_ids(engine)
+    print(
+        f"유사 문제 클러스터 {cluster_count}개 저장 완료 ({time.time() - start:.1f}초)"
+    )
+    request_question_bank_reload()
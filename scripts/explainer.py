@@ -148,18 +148,59 @@ def update_explanations_in_db(results, db_engine):
     return True
 
 
+def reuse_cluster_explanations(db_engine):
+    """
+    scripts/clusterdups.py로 묶인 클러스터에 이미 해설이 있으면, 해설이 없는 같은 클러스터 문제에 복사합니다.
+    """
+    with Session(db_engine) as session:
+        explained = session.exec(
+            select(GichulQna.cluster_id, GichulQna.explanation).where(
+                GichulQna.cluster_id != None, GichulQna.explanation != None
+            )
+        ).all()
+        explanation_by_cluster = {}
+        for cluster_id, explanation in explained:
+            explanation_by_cluster.setdefault(cluster_id, explanation)
+        unexplained = session.exec(
+            select(GichulQna.id, GichulQna.cluster_id).where(
+                GichulQna.explanation == None,
+                GichulQna.cluster_id.in_(list(explanation_by_cluster)),
+            )
+        ).all()
+    results = [
+        {"id": qna_id, "explanation": explanation_by_cluster[cluster_id]}
+        for qna_id, cluster_id in unexplained
+    ]
+    if results:
+        print(f"클러스터의 기존 해설 {len(results)}개를 재사용합니다.")
+        update_explanations_in_db(results, db_engine)
+
+
 async def fetch_and_update_routine():
     """API 호출부터 DB 업데이트 시도까지의 정상적인 흐름을 담당합니다."""
+    reuse_cluster_explanations(engine)
+
     # 1. API 호출로 데이터 가져오기
     with Session(engine) as session:
-        # 강화된 하루 처리량 제한 적용
-        total_qna_limit = DAILY_REQUEST_LIMIT * BATCH_SIZE
-        gichulqnas_to_process = session.exec(
-            select(GichulQna)
-            .where(GichulQna.explanation == None)
-            .limit(total_qna_limit)
+        unexplained_qnas = session.exec(
+            select(GichulQna).where(GichulQna.explanation == None)
         ).all()
 
+    # 유사 문제 클러스터마다 한 문제만 API에 보내고, 받은 해설은 클러스터 전체에 저장합니다.
+    cluster_members = {}
+    for qna in unexplained_qnas:
+        cluster_key = qna.cluster_id if qna.cluster_id is not None else qna.id
+        cluster_members.setdefault(cluster_key, []).append(qna)
+    members_by_representative = {
+        members[0].id: members for members in cluster_members.values()
+    }
+
+    # 강화된 하루 처리량 제한 적용
+    total_qna_limit = DAILY_REQUEST_LIMIT * BATCH_SIZE
+    gichulqnas_to_process = [
+        members[0] for members in cluster_members.values()
+    ][:total_qna_limit]
+
     if not gichulqnas_to_process:
         print("처리할 새로운 문제가 없습니다.")
         return
@@ -174,7 +215,10 @@ async def fetch_and_update_routine():
         item for sublist in all_results_nested if sublist for item in sublist
     ]
     valid_results = [
-        res for res in all_results_flat if res.get("explanation") != "오류 발생"
+        {"id": member.id, "explanation": res["explanation"]}
+        for res in all_results_flat
+        if res.get("explanation") != "오류 발생"
+        for member in members_by_representative.get(res.get("id"), [])
     ]
 
     if not valid_results:
@@ -16,6 +16,7 @@ from app.models import (
 )
 from app.database import engine
 from app.core.config import settings
+from app.services.question_bank import request_question_bank_reload
 from scripts.dbcreation import main as dropcreate
 from sqlmodel import Session
 from sqlalchemy.engine import Engine
@@ -101,3 +102,6 @@ if __name__ == "__main__":
         except Exception as e:
 
             print(f"오류: {e} at {json_file_path.name}")
+
+    # 실행 중인 서버가 있다면 새로 임포트한 문제로 뱅크를 다시 만들게 한다.
+    request_question_bank_reload()
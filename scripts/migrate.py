@@ -0,0 +1,90 @@
+import sys
+import os
+
+# 프로젝트 루트를 sys.path에 추가
+sys.path.append(os.path.dirname(os.path.abspath(os.path.dirname(__file__))))
+
+from sqlalchemy import UniqueConstraint, inspect, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.schema import CreateColumn, CreateIndex
+from sqlmodel import SQLModel
+from app.database import engine
+from app import models
+
+
+def add_missing_columns(engine: Engine):
+    """
+    모델에는 있지만 DB 테이블에는 없는 컬럼을 ALTER TABLE로 추가합니다.
+    dbcreation.py와 달리 기존 데이터는 지우지 않습니다.
+    """
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    preparer = engine.dialect.identifier_preparer
+    with engine.begin() as conn:
+        for table in SQLModel.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+            existing_columns = {c["name"] for c in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing_columns:
+                    continue
+                column_ddl = CreateColumn(column).compile(dialect=engine.dialect)
+                print(f"{table.name}.{column.name} 컬럼 추가")
+                conn.execute(
+                    text(
+                        f"ALTER TABLE {preparer.format_table(table)} ADD COLUMN {column_ddl}"
+                    )
+                )
+
+
+def add_missing_indexes(engine: Engine):
+    """
+    모델에 선언된 인덱스와 유니크 제약 중 DB에 없는 것을 만듭니다.
+    유니크 제약은 MySQL과 SQLite 모두에서 되도록 같은 이름의 UNIQUE INDEX로 만듭니다.
+    """
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    preparer = engine.dialect.identifier_preparer
+    for table in SQLModel.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        existing_names = {i["name"] for i in inspector.get_indexes(table.name)}
+        existing_names |= {
+            c["name"] for c in inspector.get_unique_constraints(table.name)
+        }
+        wanted = [(index.name, CreateIndex(index)) for index in table.indexes]
+        for constraint in table.constraints:
+            if not isinstance(constraint, UniqueConstraint) or not constraint.name:
+                continue
+            columns = ", ".join(preparer.quote(c.name) for c in constraint.columns)
+            wanted.append(
+                (
+                    constraint.name,
+                    text(
+                        f"CREATE UNIQUE INDEX {preparer.quote(constraint.name)} "
+                        f"ON {preparer.format_table(table)} ({columns})"
+                    ),
+                )
+            )
+        for name, ddl in wanted:
+            if name in existing_names:
+                continue
+            print(f"{table.name}.{name} 인덱스 추가")
+            try:
+                with engine.begin() as conn:
+                    conn.execute(ddl)
+            except SQLAlchemyError as e:
+                # 유니크 인덱스는 중복 데이터가 있으면 실패한다. 정리한 뒤 다시 실행하면 된다.
+                print(f"오류: {table.name}.{name} 생성 실패 ({e.orig})")
+
+
+def main(engine: Engine = engine):
+    # 없는 테이블만 새로 만들고, 기존 테이블에는 빠진 컬럼과 인덱스를 추가합니다.
+    SQLModel.metadata.create_all(engine)
+    add_missing_columns(engine)
+    add_missing_indexes(engine)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+import sys
+import os
+
+# 프로젝트 루트를 sys.path에 추가
+sys.path.append(os.path.dirname(os.path.abspath(os.path.dirname(__file__))))
+
+from concurrent.futures import ThreadPoolExecutor
+from app.core.config import settings
+from app.utils.image_manifest import image_manifest
+from app.utils.image_variants import image_variants, PREWARM_VARIANTS
+
+
+def prewarm_one_image(rel_path: str):
+    image_file = image_manifest.get_file(rel_path)
+    if image_file is None:
+        return
+    for width, fmt in PREWARM_VARIANTS:
+        try:
+            image_variants.get(image_file, width, fmt)
+        except Exception as e:
+            print(f"오류: {e} at {rel_path} ({width}, {fmt})")
+
+
+def main():
+    """
+    모든 회차 디렉토리의 이미지에 대해 자주 쓰는 변형 이미지를 미리 만들어 둡니다.
+    """
+    image_manifest.build()
+    rel_paths = image_manifest.all_files()
+    print(
+        f"{len(rel_paths)}개 이미지의 변형을 {settings.IMAGE_VARIANT_CACHE_PATH}에 생성합니다."
+    )
+    # 스레드는 작업을 넘기기만 하고, 실제 변환은 image_variants의 프로세스 풀에서 한다.
+    with ThreadPoolExecutor(max_workers=settings.IMAGE_VARIANT_WORKERS * 2) as pool:
+        list(pool.map(prewarm_one_image, rel_paths))
+    image_variants.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,18 @@
 import pytest, os, sys
 from pathlib import Path
 from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
 from sqlmodel import create_engine, Session, SQLModel, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 from app import models
 from app.core.config import settings
 from app.main import app
-from app.database import get_db
+from app.database import get_async_db, get_db
+from app.services.question_bank import (
+    load_question_bank,
+    wait_for_question_bank_reload,
+)
 from app.dependencies import (
     get_optional_current_activate_user,
     get_current_active_user,
@@ -14,7 +21,12 @@ from scripts.jsonImport import insertData
 
 SQLITE_DATABASE_URL = "sqlite:///./test.db"
 
+# /results/save가 요청 세션(테스트 DB)에 바로 커밋하도록 동기 모드로 돌린다.
+settings.RESULT_WRITE_BEHIND = False
+
 engine = create_engine(SQLITE_DATABASE_URL, connect_args={"check_same_thread": False})
+# TestClient마다 이벤트 루프가 달라지므로 연결을 풀에 남기지 않는다.
+async_engine = create_async_engine("sqlite+aiosqlite:///./test.db", poolclass=NullPool)
 
 
 def dropcreate():
@@ -28,6 +40,12 @@ def import_one_json():
     insertData(engine, json_path)
 
 
+def load_bank():
+    with Session(engine) as session:
+        load_question_bank(session)
+    wait_for_question_bank_reload(timeout=30)
+
+
 def add_one_user():
     valid_user = models.User(
         username="pytest@example.com",
@@ -53,6 +71,7 @@ def setup_db():
     dropcreate()
     import_one_json()
     add_one_user()
+    load_bank()
     yield
     engine.dispose()
     os.remove("./test.db")
@@ -66,6 +85,11 @@ def get_test_db(setup_db):
     db.close()
 
 
+async def get_test_async_db():
+    async with AsyncSession(async_engine, expire_on_commit=False) as db:
+        yield db
+
+
 @pytest.fixture(scope="function")
 def page_client():
     with TestClient(app) as test_client:
@@ -79,6 +103,7 @@ def client(get_test_db):
     """
 
     app.dependency_overrides[get_db] = lambda: get_test_db
+    app.dependency_overrides[get_async_db] = get_test_async_db
 
     with TestClient(app) as test_client:
         yield test_client
@@ -93,6 +118,7 @@ def signed_client(get_test_db):
     """
 
     app.dependency_overrides[get_db] = lambda: get_test_db
+    app.dependency_overrides[get_async_db] = get_test_async_db
 
     test_user = get_test_db.exec(select(models.User).where(models.User.id == 1)).one()
 
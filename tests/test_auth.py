@@ -1,3 +1,6 @@
+import pytest
+from sqlmodel import select
+
 signup_url = "/api/auth/signup"
 
 
@@ -148,4 +151,181 @@ def test_user_sign_me_401(client):
     assert response.status_code == 401
 
 
-# TODO: mock Google signing
+def test_user_sign_me_cached_and_invalidated(client, get_test_db):
+    """
+    The token carries the user id, and disabling the user takes effect on the next
+    request with the same token, even if another request cached the user before the commit.
+    """
+    import jwt
+    from sqlmodel import Session
+    from app.core.security import SECRET_KEY, ALGORITHM
+    from app.models import User
+    from app.utils.user_cache import user_cache
+
+    token_response = client.post(
+        signin_url,
+        data={"username": "pytest@example.com", "password": "stringst"},
+    )
+    access_token = token_response.json()["access_token"]
+    payload = jwt.decode(access_token, SECRET_KEY, algorithms=[ALGORITHM])
+    assert payload["uid"] == 1
+    headers = {"Authorization": f"Bearer {access_token}"}
+
+    user_cache.clear()
+    for _ in range(2):
+        response = client.get(signme_url, headers=headers)
+        assert response.status_code == 200
+        assert response.json()["indivname"] == "Ben Davis"
+
+    user = get_test_db.get(User, 1)
+    try:
+        user.disabled = True
+        get_test_db.flush()
+        # 커밋 전에 다른 요청이 커밋된 예전 값을 다시 캐시한 경우
+        with Session(get_test_db.get_bind()) as other_db:
+            assert user_cache.get("pytest@example.com", 1, other_db).disabled is False
+        get_test_db.commit()
+        response = client.get(signme_url, headers=headers)
+        assert response.status_code == 400
+        assert response.json()["detail"] == "Inactive user"
+    finally:
+        user.disabled = False
+        get_test_db.commit()
+
+
+def test_user_signin_rehashes_outdated_password(client, get_test_db):
+    """
+    Sign in with a password hashed at a lower bcrypt cost; it is rehashed with the current cost.
+    """
+    from passlib.hash import bcrypt
+    from app.core.config import settings
+    from app.models import User
+
+    get_test_db.add(
+        User(
+            username="lowcost@example.com",
+            indivname="Low Cost",
+            hashed_password=bcrypt.using(rounds=4).hash("stringst"),
+        )
+    )
+    get_test_db.commit()
+    response = client.post(
+        signin_url,
+        data={"username": "lowcost@example.com", "password": "stringst"},
+    )
+    assert response.status_code == 200
+    user = get_test_db.exec(
+        select(User).where(User.username == "lowcost@example.com")
+    ).one()
+    get_test_db.refresh(user)
+    assert user.hashed_password.startswith(f"$2b${settings.PASSWORD_BCRYPT_ROUNDS}$")
+
+
+def test_user_signin_503_when_hasher_saturated(client, monkeypatch):
+    """
+    Emulate a sign-in while the password hashing pool is full.
+    """
+    from app.core.config import settings
+
+    monkeypatch.setattr(settings, "PASSWORD_HASH_MAX_PENDING", 0)
+    response = client.post(
+        signin_url,
+        data={"username": "pytest@example.com", "password": "stringst"},
+    )
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "1"
+
+
+@pytest.fixture(scope="module")
+def google_test_keys():
+    """
+    Key pair and self-signed certificate of the stand-in Google endpoint, made per test run.
+    Used only to sign test ID tokens.
+    """
+    from datetime import datetime, timedelta, timezone
+    from cryptography import x509
+    from cryptography.hazmat.primitives import hashes, serialization
+    from cryptography.hazmat.primitives.asymmetric import rsa
+    from cryptography.x509.oid import NameOID
+
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "google-oauth-test")])
+    now = datetime.now(timezone.utc)
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(private_key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - timedelta(days=1))
+        .not_valid_after(now + timedelta(days=1))
+        .sign(private_key, hashes.SHA256())
+    )
+    private_key_pem = private_key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.TraditionalOpenSSL,
+        serialization.NoEncryption(),
+    ).decode()
+    return private_key_pem, cert.public_bytes(serialization.Encoding.PEM).decode()
+
+
+def test_google_sign_in_with_stand_in_endpoints(
+    client, get_test_db, monkeypatch, google_test_keys
+):
+    """
+    Emulate the Google callback against a local stand-in for the token and certs endpoints.
+    The certs are fetched once and reused by the next sign-in.
+    """
+    import time
+    import httpx
+    from google.auth import crypt, jwt as google_jwt
+    from app.core.config import settings
+    from app.models import User
+    from app.utils.google_oauth import google_oauth
+
+    private_key_pem, cert_pem = google_test_keys
+    now = int(time.time())
+    signer = crypt.RSASigner.from_string(private_key_pem, key_id="test-kid")
+    id_token_jwt = google_jwt.encode(
+        signer,
+        {
+            "iss": "https://accounts.google.com",
+            "aud": settings.GOOGLE_CLIENT_ID,
+            "sub": "google-sub-1",
+            "email": "googler@example.com",
+            "name": "Google User",
+            "picture": "https://example.com/picture.png",
+            "iat": now,
+            "exp": now + 600,
+        },
+    ).decode()
+    requested = []
+
+    def stand_in(request: httpx.Request) -> httpx.Response:
+        requested.append(str(request.url))
+        if str(request.url) == "http://google.test/token":
+            return httpx.Response(200, json={"id_token": id_token_jwt})
+        return httpx.Response(
+            200,
+            json={"test-kid": cert_pem},
+            headers={"Cache-Control": "public, max-age=3600"},
+        )
+
+    monkeypatch.setattr(settings, "GOOGLE_TOKEN_URL", "http://google.test/token")
+    monkeypatch.setattr(settings, "GOOGLE_CERTS_URL", "http://google.test/certs")
+    monkeypatch.setattr(google_oauth, "transport", httpx.MockTransport(stand_in))
+    monkeypatch.setattr(google_oauth, "_certs_expire_at", float("-inf"))
+    monkeypatch.setattr(google_oauth, "_client", None)
+
+    for _ in range(2):
+        response = client.get(
+            "/api/auth/sign/google", params={"code": "abc"}, follow_redirects=False
+        )
+        assert response.status_code == 307
+        assert "token=" in response.headers["location"]
+    assert requested.count("http://google.test/certs") == 1
+    assert requested.count("http://google.test/token") == 2
+    user = get_test_db.exec(
+        select(User).where(User.google_sub == "google-sub-1")
+    ).one()
+    assert user.username == "googler@example.com"
@@ -18,6 +18,13 @@ def test_get_one_random_qna_set_unsigned_200(client):
     assert any(qna["imgPaths"] for qna in response_data["subjects"]["영어"])
 
 
+def test_get_one_random_qna_set_without_answers_200(client):
+    response = client.get(cbt_url, params={**cbt_params_successful, "answers": "false"})
+    assert response.status_code == 200
+    for qnas in response.json()["subjects"].values():
+        assert all(qna["answer"] is None and qna["explanation"] is None for qna in qnas)
+
+
 def test_get_one_random_qna_set_unsigned_404(client):
     """
     Emulate sending the wrong parameter "직무일반" as a subject.
@@ -42,3 +49,41 @@ def test_get_one_random_qna_set_signed_200(signed_client):
     response_data = response.json()
     assert "odapset_id" in response_data
     assert response_data["odapset_id"] is not None
+
+
+def test_get_one_random_qna_set_unique_200(client):
+    """
+    Check that each subject gets 25 distinct questions renumbered from 1.
+    """
+    response = client.get(cbt_url, params=cbt_params_successful)
+    assert response.status_code == 200
+    for qnas in response.json()["subjects"].values():
+        assert len(qnas) == 25
+        assert len({qna["id"] for qna in qnas}) == 25
+        assert [qna["qnum"] for qna in qnas] == list(range(1, 26))
+
+
+def test_get_one_random_qna_set_seeded_200(client):
+    """
+    Check that the same seed draws the same exam.
+    """
+    params = {**cbt_params_successful, "seed": 1234}
+    first = client.get(cbt_url, params=params).json()
+    second = client.get(cbt_url, params=params).json()
+    assert first["seed"] == second["seed"] == 1234
+    assert first["subjects"] == second["subjects"]
+
+
+def test_get_one_drawn_qna_set_200(signed_client):
+    """
+    Emulate resuming a CBT from the question manifest saved on its resultset.
+    """
+    drawn = signed_client.get(cbt_url, params=cbt_params_successful).json()
+    response = signed_client.get(f"{cbt_url}/{drawn['odapset_id']}")
+    assert response.status_code == 200
+    assert response.json() == drawn
+
+
+def test_get_one_drawn_qna_set_404(signed_client):
+    response = signed_client.get(f"{cbt_url}/0")  # fail
+    assert response.status_code == 404
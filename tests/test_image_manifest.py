@@ -0,0 +1,117 @@
+import os
+from app.core.config import settings
+from app.services import question_bank
+from app.utils import image_manifest as image_manifest_module
+from app.utils.image_manifest import ImageManifest, image_manifest
+
+inning_dir = "항해사/D1_2021_01"
+
+
+def _make_inning(base_path, *names):
+    directory = base_path / "항해사" / "D1_2099_01"
+    directory.mkdir(parents=True, exist_ok=True)
+    for name in names:
+        (directory / name).write_bytes(b"png")
+    return directory
+
+
+def test_manifest_scans_directory_once(tmp_path, monkeypatch):
+    """
+    Repeated lookups of an unchanged directory reuse the first scan.
+    """
+    monkeypatch.setattr(settings, "BASE_PATH", tmp_path)
+    _make_inning(tmp_path, "D1_2099_01-pic1.png")
+    scanned = []
+    path_getter = image_manifest_module.path_getter
+    monkeypatch.setattr(
+        image_manifest_module,
+        "path_getter",
+        lambda directory: scanned.append(directory) or path_getter(directory),
+    )
+    manifest = ImageManifest()
+    for _ in range(3):
+        paths = manifest.get("항해사/D1_2099_01")
+        assert dict(paths) == {"pic1": "항해사/D1_2099_01/D1_2099_01-pic1.png"}
+    assert scanned == ["항해사/D1_2099_01"]
+
+
+def test_manifest_rescans_when_directory_mtime_changes(tmp_path, monkeypatch):
+    """
+    Adding an image changes the directory mtime, and the next revalidation picks it up.
+    """
+    monkeypatch.setattr(settings, "BASE_PATH", tmp_path)
+    monkeypatch.setattr(image_manifest_module, "REVALIDATE_INTERVAL_SEC", 0.0)
+    directory = _make_inning(tmp_path, "D1_2099_01-pic1.png")
+    manifest = ImageManifest()
+    assert set(manifest.get("항해사/D1_2099_01")) == {"pic1"}
+
+    _make_inning(tmp_path, "D1_2099_01-pic2.png")
+    mtime_ns = directory.stat().st_mtime_ns + 1_000_000_000
+    os.utime(directory, ns=(mtime_ns, mtime_ns))
+    assert set(manifest.get("항해사/D1_2099_01")) == {"pic1", "pic2"}
+    assert manifest.get_file("항해사/D1_2099_01/D1_2099_01-pic2.png") is not None
+
+
+def test_manifest_rehashes_image_overwritten_in_place(tmp_path, monkeypatch):
+    """
+    Overwriting an image under the same name leaves the directory mtime alone,
+    but the next lookup returns the new size and ETag.
+    """
+    monkeypatch.setattr(settings, "BASE_PATH", tmp_path)
+    directory = _make_inning(tmp_path, "D1_2099_01-pic1.png")
+    rel_path = "항해사/D1_2099_01/D1_2099_01-pic1.png"
+    manifest = ImageManifest()
+    old_file = manifest.get_file(rel_path)
+    assert manifest.get_file(rel_path) is old_file
+
+    dir_mtime_ns = directory.stat().st_mtime_ns
+    image_path = directory / "D1_2099_01-pic1.png"
+    image_path.write_bytes(b"a larger png")
+    file_mtime_ns = old_file.stat_result.st_mtime_ns + 1_000_000_000
+    os.utime(image_path, ns=(file_mtime_ns, file_mtime_ns))
+    assert directory.stat().st_mtime_ns == dir_mtime_ns
+
+    new_file = manifest.get_file(rel_path)
+    assert new_file.stat_result.st_size == len(b"a larger png")
+    assert new_file.etag != old_file.etag
+
+
+def test_cbt_image_paths_come_from_manifest(client):
+    """
+    Every image path in a CBT response is one the manifest indexed for that inning.
+    """
+    response = client.get(
+        "/api/cbt", params={"license": "항해사", "level": "1", "subjects": ["영어"]}
+    )
+    assert response.status_code == 200
+    img_paths = {
+        path
+        for qna in response.json()["subjects"]["영어"]
+        for path in qna["imgPaths"] or ()
+    }
+    assert img_paths
+    assert img_paths == set(image_manifest.get(inning_dir).values())
+
+
+def test_mypage_odap_image_paths_come_from_manifest(solve_response, signed_client):
+    """
+    A wrong answer to a question with a picture shows the manifest path on mypage.
+    """
+    odapset_id, _, _ = solve_response
+    bank = question_bank._bank
+    qna = next(qna for qna in bank.qnas.values() if qna.imgPaths)
+    wrong_choice = "가" if qna.answer != "가" else "나"
+    response = signed_client.post(
+        "/api/results/save",
+        json={
+            "choice": wrong_choice,
+            "gichulqna_id": qna.id,
+            "odapset_id": odapset_id,
+        },
+    )
+    assert response.status_code == 201
+    odaps = signed_client.get("/api/mypage/odaps").json()
+    odap = next(odap for odap in odaps if odap["id"] == qna.id)
+    manifest_paths = image_manifest.get(inning_dir)
+    assert odap["imgPaths"]
+    assert set(odap["imgPaths"]) <= set(manifest_paths.values())
@@ -0,0 +1,55 @@
+from sqlalchemy import inspect, text
+from sqlmodel import SQLModel, create_engine
+from scripts.migrate import add_missing_indexes, main
+
+NEW_INDEXES = {
+    "gichulset": "uq_gichulset_inning",
+    "resultset": "ix_resultset_user_examtype_id",
+    "result": "ix_result_resultset_hidden",
+    "user": "ix_user_google_sub",
+}
+
+
+def _index_names(engine):
+    inspector = inspect(engine)
+    return {
+        table: {index["name"] for index in inspector.get_indexes(table)}
+        for table in NEW_INDEXES
+    }
+
+
+def test_migrate_adds_missing_indexes(tmp_path, capsys):
+    """
+    Run the migration on a database created before the indexes existed, then run it again as a no-op.
+    """
+    engine = create_engine(f"sqlite:///{tmp_path / 'migrate.db'}")
+    SQLModel.metadata.create_all(engine)
+    with engine.begin() as conn:
+        for table, name in NEW_INDEXES.items():
+            if table != "gichulset":
+                conn.execute(text(f"DROP INDEX {name}"))
+        # SQLite는 테이블에 선언된 유니크 제약을 지울 수 없으므로 제약 없이 다시 만든다.
+        conn.execute(text("DROP TABLE gichulset"))
+        conn.execute(
+            text(
+                "CREATE TABLE gichulset (id INTEGER PRIMARY KEY, type VARCHAR, "
+                "grade VARCHAR, year INTEGER, inning VARCHAR)"
+            )
+        )
+    before = _index_names(engine)
+    assert all(name not in before[table] for table, name in NEW_INDEXES.items())
+
+    main(engine)
+    after = _index_names(engine)
+    assert all(name in after[table] for table, name in NEW_INDEXES.items())
+    unique = {
+        index["name"]: index["unique"]
+        for index in inspect(engine).get_indexes("gichulset")
+    }
+    assert unique["uq_gichulset_inning"]
+
+    capsys.readouterr()
+    add_missing_indexes(engine)
+    assert capsys.readouterr().out == ""
+    assert _index_names(engine) == after
+    engine.dispose()
@@ -1,3 +1,7 @@
+from app import models
+from app.crud.resultset_crud import read_subject_counts
+from app.services.question_bank import get_question_bank
+
 odaps_url = "/api/mypage/odaps"
 
 
@@ -29,6 +33,38 @@ def test_get_odaps_200(save_many_and_get_mypage_exam_response, signed_client):
     assert required_gichulset_keys == response_data[0]["gichulset"].keys()
 
 
+def test_get_odaps_imgpaths_200(solve_response, signed_client):
+    """
+    Check that an odap of a question with a diagram carries its image paths.
+    """
+    odapset_id, _, _ = solve_response
+    qna = signed_client.get(
+        "/api/solve/",
+        params={
+            "examtype": "practice",
+            "year": "2021",
+            "license": "항해사",
+            "level": "1",
+            "round": "1",
+        },
+    ).json()["qnas"][96]
+    wrong_choice = "가" if qna["answer"] != "가" else "나"
+    save_response = signed_client.post(
+        "/api/results/save",
+        json={
+            "choice": wrong_choice,
+            "gichulqna_id": qna["id"],
+            "answer": qna["answer"],
+            "odapset_id": odapset_id,
+        },
+    )
+    assert save_response.status_code == 201
+    response = signed_client.get(odaps_url)
+    assert response.status_code == 200
+    odap = next(odap for odap in response.json() if odap["id"] == qna["id"])
+    assert odap["imgPaths"] == qna["imgPaths"]
+
+
 cbt_url = "/api/mypage/cbt_results"
 
 
@@ -87,3 +123,144 @@ def test_mypage_exam_200(save_many_and_get_mypage_exam_response, signed_client):
     }
     for subject_data in subject_scores_data.values():
         assert required_subject_keys == subject_data.keys()
+
+
+def test_mypage_exam_unscored_200(signed_client, get_test_db):
+    """
+    Emulate a session saved before per-subject scores were recorded at submission time.
+    """
+    resultset = models.ResultSet(examtype=models.ExamType.real, user_id=1)
+    get_test_db.add(resultset)
+    get_test_db.flush()
+    get_test_db.add(
+        models.Result(choice="가", correct=True, gichulqna_id=1, resultset_id=resultset.id)
+    )
+    get_test_db.add(
+        models.Result(choice="가", correct=False, gichulqna_id=2, resultset_id=resultset.id)
+    )
+    get_test_db.commit()
+    response = signed_client.get(mypage_exam_url)
+    assert response.status_code == 200
+    session_data = next(
+        data for data in response.json() if data["resultset_id"] == resultset.id
+    )
+    assert session_data["total_amount_of_questions"] == 2
+    assert session_data["total_correct_counts"] == 1
+    get_test_db.refresh(resultset)
+    assert resultset.gichulset_id is not None
+
+
+def test_mypage_exam_paginated_200(save_many_and_get_mypage_exam_response, signed_client):
+    """
+    Emulate lazily scrolling the exam history one session at a time with the cursor header.
+    """
+    seen_ids = []
+    cursor = None
+    while True:
+        params = {"limit": 1} if cursor is None else {"limit": 1, "cursor": cursor}
+        response = signed_client.get(mypage_exam_url, params=params)
+        assert response.status_code == 200
+        response_data = response.json()
+        assert len(response_data) <= 1
+        seen_ids.extend(data["resultset_id"] for data in response_data)
+        cursor = response.headers.get("x-next-cursor")
+        if cursor is None:
+            break
+    full_ids = [data["resultset_id"] for data in signed_client.get(mypage_exam_url).json()]
+    assert len(seen_ids) >= 1
+    assert seen_ids == sorted(seen_ids, reverse=True)
+    assert seen_ids[: len(full_ids)] == full_ids
+
+
+def test_mypage_odaps_paginated_200(save_many_and_get_mypage_exam_response, signed_client):
+    first_page = signed_client.get(odaps_url, params={"limit": 1})
+    assert first_page.status_code == 200
+    qna_ids = [qna["id"] for qna in first_page.json()]
+    cursor = first_page.headers.get("x-next-cursor")
+    while cursor is not None:
+        page = signed_client.get(odaps_url, params={"limit": 1, "cursor": cursor})
+        assert page.status_code == 200
+        qna_ids.extend(qna["id"] for qna in page.json())
+        cursor = page.headers.get("x-next-cursor")
+    assert len(qna_ids) == len(set(qna_ids))
+
+
+def test_mypage_invalid_cursor_422(signed_client):
+    response = signed_client.get(mypage_exam_url, params={"cursor": "not-a-cursor"})  # fail
+    assert response.status_code == 422
+
+
+def test_odaps_attempts_and_hide_200(solve_response, signed_client):
+    """
+    Answer the same question wrong twice, then hide it from the wrong-answer notebook.
+    """
+    odapset_id, gichulqna_id, answer = solve_response
+    wrong_choice = "가" if answer != "가" else "나"
+    before = next(
+        (odap for odap in signed_client.get(odaps_url).json() if odap["id"] == gichulqna_id),
+        None,
+    )
+    for _ in range(2):
+        save_response = signed_client.post(
+            "/api/results/save",
+            json={
+                "choice": wrong_choice,
+                "gichulqna_id": gichulqna_id,
+                "odapset_id": odapset_id,
+            },
+        )
+        assert save_response.status_code == 201
+    odaps = signed_client.get(odaps_url, params={"limit": 50}).json()
+    odap = next(odap for odap in odaps if odap["id"] == gichulqna_id)
+    assert odap["attempt_counts"] == (before["attempt_counts"] if before else 0) + 2
+    assert odap["choice"] == wrong_choice
+    assert odaps[0]["id"] == gichulqna_id
+
+    delete_response = signed_client.delete(f"/api/results/{odap['result_id']}")
+    assert delete_response.status_code == 204
+    odaps = signed_client.get(odaps_url, params={"limit": 50}).json()
+    assert all(odap["id"] != gichulqna_id for odap in odaps)
+
+
+def test_read_subject_counts_groups_several_resultsets(get_test_db):
+    """
+    One GROUP BY query returns per-subject question and correct counts for each resultset,
+    with subjects in the order they were first answered.
+    """
+    bank = get_question_bank(get_test_db)
+    by_subject = {}
+    for qna in bank.qnas.values():
+        by_subject.setdefault(qna.subject, []).append(qna)
+    hanghae, english = models.GichulSubject.hanghae, models.GichulSubject.english
+    first = models.ResultSet(examtype=models.ExamType.real, user_id=1)
+    second = models.ResultSet(examtype=models.ExamType.practice, user_id=1)
+    get_test_db.add_all([first, second])
+    get_test_db.flush()
+    answers = [
+        # (resultset, qna, correct)
+        (first, by_subject[english][0], True),
+        (first, by_subject[hanghae][0], True),
+        (first, by_subject[hanghae][1], False),
+        (first, by_subject[english][1], False),
+        (first, by_subject[english][2], True),
+        (second, by_subject[hanghae][2], False),
+        (second, by_subject[hanghae][3], False),
+    ]
+    for resultset, qna, correct in answers:
+        get_test_db.add(
+            models.Result(
+                resultset_id=resultset.id,
+                gichulqna_id=qna.id,
+                choice=qna.answer if correct else None,
+                correct=correct,
+            )
+        )
+    get_test_db.flush()
+
+    rows = read_subject_counts([first.id, second.id], get_test_db)
+    gichulset_id = by_subject[hanghae][0].gichulset_id
+    assert [tuple(row) for row in rows] == [
+        (first.id, english, 3, 2, gichulset_id),
+        (first.id, hanghae, 2, 1, gichulset_id),
+        (second.id, hanghae, 2, 0, gichulset_id),
+    ]
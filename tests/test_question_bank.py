@@ -0,0 +1,66 @@
+import asyncio
+import os
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.services import question_bank
+from tests.conftest import async_engine
+
+
+def test_async_getter_reloads_after_stamp_changes(setup_db, tmp_path, monkeypatch):
+    """
+    After an import touches the stamp, the async getter keeps serving the current bank
+    while the new one is built in the background, then returns the new bank.
+    """
+    old_bank = question_bank._bank
+    # 실제 데이터 디렉토리의 스탬프는 건드리지 않고, 끝나면 원래 뱅크로 되돌린다.
+    stamp_path = tmp_path / question_bank.BANK_STAMP_NAME
+    monkeypatch.setattr(question_bank, "_stamp_path", lambda: stamp_path)
+    monkeypatch.setattr(question_bank, "_bank", old_bank)
+    monkeypatch.setattr(old_bank, "checked_at", float("-inf"))
+    stamp_path.touch()
+    new_ns = (old_bank.stamp or 0) + 1_000_000_000
+    os.utime(stamp_path, ns=(new_ns, new_ns))
+
+    async def get_bank():
+        async with AsyncSession(async_engine) as db:
+            return await question_bank.get_question_bank_async(db)
+
+    assert asyncio.run(get_bank()) is old_bank
+    question_bank.wait_for_question_bank_reload(timeout=30)
+    new_bank = asyncio.run(get_bank())
+    assert new_bank is not old_bank
+    assert new_bank.stamp == new_ns == question_bank._read_stamp()
+    assert new_bank.qnas == old_bank.qnas
+    assert new_bank.similar == old_bank.similar
+
+
+def test_cluster_near_duplicates():
+    """
+    Near-identical texts share a cluster (the smallest id) and a different text stays apart.
+    """
+    from app.utils.dedup_utils import cluster_near_duplicates
+
+    question = "선박이 좁은 수로를 항행할 때 우측 항행 원칙에 따라 수로의 오른쪽 끝을 따라 항행하여야 한다. 다음 중 옳은 것은?"
+    clusters = cluster_near_duplicates(
+        [30, 10, 20],
+        [
+            question.replace("옳은", "맞는"),
+            question,
+            "디젤 기관의 연료 분사 밸브에서 분사 압력이 낮아지는 원인으로 옳지 않은 것은?",
+        ],
+    )
+    assert clusters == {10: 10, 30: 10, 20: 20}
+
+
+def test_cbt_pool_keeps_one_question_per_cluster(setup_db):
+    """
+    Two questions of the same subject in one cluster contribute a single question to the CBT pool.
+    """
+    bank = question_bank._bank
+    sets = list(bank.sets.values())
+    pool_key, pool = next(iter(question_bank._build_cbt_pools(sets, {}).items()))
+    first, second = pool[0], pool[1]
+
+    pools = question_bank._build_cbt_pools(sets, {first: first, second: first})
+    assert first in pools[pool_key]
+    assert second not in pools[pool_key]
+    assert len(pools[pool_key]) == len(pool) - 1
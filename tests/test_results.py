@@ -1,3 +1,10 @@
+import pytest
+from sqlalchemy import event
+from sqlmodel import Session, create_engine, select
+from app.models import Result, ResultSet, UserOdap
+from app.services.result_buffer import ResultWriteBuffer
+from tests.conftest import SQLITE_DATABASE_URL, async_engine
+
 save_one_url = "/api/results/save"
 
 
@@ -33,6 +40,23 @@ def test_save_one_404(solve_response, signed_client):
     assert str(response.json()["detail"]).startswith("Resultset with")
 
 
+def test_save_one_unknown_qna_404(solve_response, signed_client):
+    """
+    Emulate a request with a gichulqna_id missing from the question bank.
+    """
+    odapset_id, _, _ = solve_response
+    response = signed_client.post(
+        save_one_url,
+        json={
+            "choice": "가",
+            "gichulqna_id": 999999,  # fail
+            "odapset_id": odapset_id,
+        },
+    )
+    assert response.status_code == 404
+    assert str(response.json()["detail"]).startswith("GichulQna with")
+
+
 def test_save_one_422(solve_response, signed_client):
     """
     Emulate a request that fails the schema validation by sending "다" as a choice when it has to be one of "가", "나", "사", or "아".
@@ -94,6 +118,116 @@ def test_save_many_201(solve_response, signed_client):
     assert subject_score_keys == response_data["subject_scores"]["항해"].keys()
 
 
+def test_save_many_graded_by_server_201(signed_client):
+    """
+    Emulate a client that sends no answers, or wrong ones, so grading must use the server's answer key.
+    """
+    solve_data = signed_client.get(
+        "/api/solve/",
+        params={
+            "examtype": "exam",
+            "year": "2021",
+            "license": "항해사",
+            "level": "1",
+            "round": "1",
+        },
+    ).json()
+    qnas = solve_data["qnas"][:10]
+    wrong = {"가": "나", "나": "가", "사": "아", "아": "사"}
+    response = signed_client.post(
+        save_many_url,
+        json={
+            "odapset_id": solve_data["odapset_id"],
+            "duration_sec": 3600,
+            "results": [
+                {"choice": qna["answer"], "gichulqna_id": qna["id"]} for qna in qnas[:6]
+            ]
+            + [
+                {
+                    "choice": wrong[qna["answer"]],
+                    "answer": wrong[qna["answer"]],
+                    "gichulqna_id": qna["id"],
+                }
+                for qna in qnas[6:]
+            ],
+        },
+    )
+    assert response.status_code == 201
+    response_data = response.json()
+    assert response_data["total_amount_of_questions"] == 10
+    assert response_data["total_correct_counts"] == 6
+    details = signed_client.get(f"/api/results/{solve_data['odapset_id']}").json()
+    assert details["total_score"] == 6
+    assert sum(result["correct"] for result in details["results"]) == 6
+
+
+@pytest.mark.parametrize("returning", [True, False])
+def test_save_many_writes_rows_and_totals(
+    signed_client, get_test_db, monkeypatch, returning
+):
+    """
+    A savemany bulk-inserts one graded row per answer and writes the resultset totals in a single UPDATE.
+    Without INSERT ... RETURNING (MySQL) the wrong answers get their ids from row-by-row inserts.
+    """
+    monkeypatch.setattr(
+        async_engine.sync_engine.dialect,
+        "insert_executemany_returning_sort_by_parameter_order",
+        returning,
+    )
+    solve_data = signed_client.get(
+        "/api/solve/",
+        params={
+            "examtype": "exam",
+            "year": "2021",
+            "license": "항해사",
+            "level": "1",
+            "round": "1",
+        },
+    ).json()
+    odapset_id = solve_data["odapset_id"]
+    qnas = solve_data["qnas"][:4]
+    wrong = {"가": "나", "나": "가", "사": "아", "아": "사"}
+    choices = [qnas[0]["answer"], qnas[1]["answer"], wrong[qnas[2]["answer"]], None]
+    response = signed_client.post(
+        save_many_url,
+        json={
+            "odapset_id": odapset_id,
+            "duration_sec": 1234,
+            "results": [
+                {"choice": choice, "gichulqna_id": qna["id"]}
+                for qna, choice in zip(qnas, choices)
+            ],
+        },
+    )
+    assert response.status_code == 201
+
+    get_test_db.expire_all()
+    saved = get_test_db.exec(
+        select(Result)
+        .where(Result.resultset_id == odapset_id)
+        .order_by(Result.gichulqna_id)
+    ).all()
+    assert [(r.gichulqna_id, r.choice, r.correct) for r in saved] == [
+        (qnas[0]["id"], qnas[0]["answer"], True),
+        (qnas[1]["id"], qnas[1]["answer"], True),
+        (qnas[2]["id"], wrong[qnas[2]["answer"]], False),
+        (qnas[3]["id"], None, False),
+    ]
+    resultset = get_test_db.get(ResultSet, odapset_id)
+    assert resultset.duration_sec == 1234
+    assert resultset.gichulset_id == qnas[0]["gichulset_id"]
+    assert resultset.total_amount == response.json()["total_amount_of_questions"]
+    assert resultset.total_score == response.json()["total_correct_counts"] == 2
+    assert resultset.passed == response.json()["if_passed_test"]
+    # 선택하지 않은 문제는 오답노트에 넣지 않는다.
+    odap = get_test_db.exec(
+        select(UserOdap).where(
+            UserOdap.user_id == 1, UserOdap.gichulqna_id == qnas[2]["id"]
+        )
+    ).one()
+    assert odap.result_id == saved[2].id
+
+
 def test_save_many_404(signed_client):
     response = signed_client.post(
         save_many_url,
@@ -118,6 +252,26 @@ def test_save_many_404(signed_client):
     assert str(response.json()["detail"]).startswith("Resultset with")
 
 
+def test_save_many_unknown_qna_404(solve_response, signed_client):
+    """
+    Emulate a submission that contains a gichulqna_id missing from the question bank.
+    """
+    odapset_id, gichulqna_id, _ = solve_response
+    response = signed_client.post(
+        save_many_url,
+        json={
+            "odapset_id": odapset_id,
+            "duration_sec": 3600,
+            "results": [
+                {"choice": "아", "gichulqna_id": gichulqna_id},
+                {"choice": "가", "gichulqna_id": 999999},  # fail
+            ],
+        },
+    )
+    assert response.status_code == 404
+    assert str(response.json()["detail"]).startswith("GichulQna with")
+
+
 def test_save_many_422(solve_response, signed_client):
     odapset_id, _, _ = solve_response
     response = signed_client.post(
@@ -142,6 +296,18 @@ def test_save_many_422(solve_response, signed_client):
     assert response.status_code == 422
 
 
+def test_save_many_empty_422(solve_response, signed_client):
+    """
+    Emulate a submission without any answers.
+    """
+    odapset_id, _, _ = solve_response
+    response = signed_client.post(
+        save_many_url,
+        json={"odapset_id": odapset_id, "duration_sec": 3600, "results": []},  # fail
+    )
+    assert response.status_code == 422
+
+
 def test_soft_delete_one_204(save_one_and_get_mypage_response, signed_client):
     result_id = save_one_and_get_mypage_response
     response = signed_client.delete(f"/api/results/{result_id}")
@@ -196,3 +362,187 @@ def test_get_test_result_404(save_many_and_get_mypage_exam_response, signed_clie
 def test_get_test_result_422(signed_client):
     response = signed_client.get("/api/results/a_string")  # fail
     assert response.status_code == 422
+
+
+def test_result_buffer_flush(solve_response, get_test_db):
+    """
+    Buffer two answers in write-behind mode and check one flush writes both and the wrong-answer notebook.
+    """
+    odapset_id, gichulqna_id, answer = solve_response
+    wrong_choice = "가" if answer != "가" else "나"
+    buffer = ResultWriteBuffer(lambda: Session(get_test_db.get_bind()))
+    for choice, correct in ((answer, True), (wrong_choice, False)):
+        buffer.add(
+            1,
+            {
+                "choice": choice,
+                "correct": correct,
+                "hidden": False,
+                "gichulqna_id": gichulqna_id,
+                "resultset_id": odapset_id,
+            },
+        )
+    assert buffer.pending_count() == 2
+    buffer.close()
+    assert buffer.pending_count() == 0
+    saved = get_test_db.exec(
+        select(Result).where(Result.resultset_id == odapset_id)
+    ).all()
+    assert [result.correct for result in saved] == [True, False]
+    odap = get_test_db.exec(
+        select(UserOdap).where(
+            UserOdap.user_id == 1, UserOdap.gichulqna_id == gichulqna_id
+        )
+    ).one()
+    assert odap.result_id == saved[1].id
+
+
+def test_result_buffer_flush_without_returning(solve_response, get_test_db):
+    """
+    Emulate a backend without INSERT ... RETURNING (MySQL): correct answers go in one
+    executemany and only the wrong ones are inserted row by row for their ids.
+    """
+    odapset_id, gichulqna_id, answer = solve_response
+    wrong_choice = "가" if answer != "가" else "나"
+    no_returning_engine = create_engine(SQLITE_DATABASE_URL)
+    no_returning_engine.dialect.insert_executemany_returning_sort_by_parameter_order = (
+        False
+    )
+    inserts = []
+    event.listen(
+        no_returning_engine,
+        "before_cursor_execute",
+        lambda conn, cursor, statement, params, context, executemany: (
+            inserts.append(executemany)
+            if statement.startswith("INSERT INTO result ")
+            else None
+        ),
+    )
+    buffer = ResultWriteBuffer(lambda: Session(no_returning_engine))
+    choices = [answer, wrong_choice, answer, wrong_choice, answer]
+    for choice in choices:
+        buffer.add(
+            1,
+            {
+                "choice": choice,
+                "correct": choice == answer,
+                "hidden": False,
+                "gichulqna_id": gichulqna_id,
+                "resultset_id": odapset_id,
+            },
+        )
+    assert buffer.flush() == 5
+    buffer.close()
+    no_returning_engine.dispose()
+    assert inserts == [True, False, False]
+    saved = get_test_db.exec(
+        select(Result).where(Result.resultset_id == odapset_id)
+    ).all()
+    assert sorted(result.correct for result in saved) == [False, False, True, True, True]
+    odap = get_test_db.exec(
+        select(UserOdap).where(
+            UserOdap.user_id == 1, UserOdap.gichulqna_id == gichulqna_id
+        )
+    ).one()
+    assert odap.result_id == max(result.id for result in saved if not result.correct)
+
+
+def test_result_buffer_sets_aside_invalid_rows(solve_response, get_test_db):
+    """
+    A row that violates a foreign key is dropped on flush while the other buffered rows are written.
+    """
+    odapset_id, gichulqna_id, answer = solve_response
+    fk_engine = create_engine(SQLITE_DATABASE_URL)
+    event.listen(
+        fk_engine,
+        "connect",
+        lambda conn, _: conn.execute("PRAGMA foreign_keys=ON"),
+    )
+    buffer = ResultWriteBuffer(lambda: Session(fk_engine))
+    for qna_id in (gichulqna_id, 999999, gichulqna_id):
+        buffer.add(
+            1,
+            {
+                "choice": answer,
+                "correct": qna_id == gichulqna_id,
+                "hidden": False,
+                "gichulqna_id": qna_id,
+                "resultset_id": odapset_id,
+            },
+        )
+    assert buffer.flush() == 2
+    assert buffer.pending_count() == 0
+    buffer.close()
+    fk_engine.dispose()
+    saved = get_test_db.exec(
+        select(Result).where(Result.resultset_id == odapset_id)
+    ).all()
+    assert [result.gichulqna_id for result in saved] == [gichulqna_id, gichulqna_id]
+
+
+def test_save_one_503_when_buffer_full(solve_response, signed_client, monkeypatch):
+    """
+    Emulate a save in write-behind mode while the buffer is full; it is rejected instead of flushing on the request.
+    """
+    from app.core.config import settings
+    from app.services.result_buffer import result_buffer
+
+    odapset_id, gichulqna_id, answer = solve_response
+    monkeypatch.setattr(settings, "RESULT_WRITE_BEHIND", True)
+    monkeypatch.setattr(settings, "RESULT_BUFFER_MAX_ROWS", 0)
+    response = signed_client.post(
+        save_one_url,
+        json={
+            "choice": answer,
+            "gichulqna_id": gichulqna_id,
+            "odapset_id": odapset_id,
+        },
+    )
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "1"
+    assert result_buffer.pending_count() == 0
+
+
+def test_save_one_write_behind_201(
+    solve_response, signed_client, get_test_db, monkeypatch
+):
+    """
+    Save a wrong answer in the default write-behind mode: the response has no id yet,
+    and the row and the wrong-answer notebook entry appear after a flush.
+    """
+    from app.core.config import settings
+    from app.services.result_buffer import result_buffer
+
+    odapset_id, gichulqna_id, answer = solve_response
+    wrong_choice = "가" if answer != "가" else "나"
+    monkeypatch.setattr(settings, "RESULT_WRITE_BEHIND", True)
+    monkeypatch.setattr(
+        result_buffer, "_session_factory", lambda: Session(get_test_db.get_bind())
+    )
+    response = signed_client.post(
+        save_one_url,
+        json={
+            "choice": wrong_choice,
+            "gichulqna_id": gichulqna_id,
+            "odapset_id": odapset_id,
+        },
+    )
+    assert response.status_code == 201
+    assert response.json()["id"] is None
+    assert response.json()["correct"] is False
+    result_buffer.flush()
+    assert result_buffer.pending_count() == 0
+    saved = get_test_db.exec(
+        select(Result).where(Result.resultset_id == odapset_id)
+    ).one()
+    assert (saved.gichulqna_id, saved.choice, saved.correct) == (
+        gichulqna_id,
+        wrong_choice,
+        False,
+    )
+    odap = get_test_db.exec(
+        select(UserOdap).where(
+            UserOdap.user_id == 1, UserOdap.gichulqna_id == gichulqna_id
+        )
+    ).one()
+    assert odap.result_id == saved.id
@@ -0,0 +1,90 @@
+search_url = "/api/search/"
+
+
+def test_search_200(client):
+    response = client.get(search_url, params={"q": "운용 과목 문제 7번"})
+    assert response.status_code == 200
+    response_data = response.json()
+    assert isinstance(response_data, list)
+    assert 0 < len(response_data) <= 20
+    assert response_data[0]["questionstr"].startswith("운용 과목 문제 7번")
+    assert "explanation" in response_data[0]
+    assert "imgPaths" in response_data[0]
+    scores = [qna["score"] for qna in response_data]
+    assert scores == sorted(scores, reverse=True)
+
+
+def test_search_no_match_200(client):
+    response = client.get(search_url, params={"q": "존재하지않는낱말"})
+    assert response.status_code == 200
+    assert response.json() == []
+
+
+def test_search_422(client):
+    """
+    Emulate a query shorter than the minimum length.
+    """
+    response = client.get(search_url, params={"q": "가"})  # fail
+    assert response.status_code == 422
+
+
+def test_similar_200(client):
+    qna_id = client.get(search_url, params={"q": "운용 과목 문제 7번"}).json()[0]["id"]
+    response = client.get(f"{search_url}similar/{qna_id}", params={"limit": 5})
+    assert response.status_code == 200
+    response_data = response.json()
+    assert 0 < len(response_data) <= 5
+    assert all(qna["id"] != qna_id for qna in response_data)
+    similarities = [qna["similarity"] for qna in response_data]
+    assert similarities == sorted(similarities, reverse=True)
+
+
+def test_similar_404(client):
+    """
+    Emulate a gichulqna_id that is not in the question bank.
+    """
+    response = client.get(f"{search_url}similar/999999")  # fail
+    assert response.status_code == 404
+
+
+def test_similar_503_while_building(client, monkeypatch):
+    """
+    Emulate a request right after startup, before the similar-question table is built.
+    """
+    from app.services import question_bank
+
+    qna_id = next(iter(question_bank._bank.qnas))
+    monkeypatch.setattr(question_bank._bank, "similar", None)
+    response = client.get(f"{search_url}similar/{qna_id}")
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "5"
+
+
+def test_tfidf_neighbors_skips_same_group_and_common_grams(monkeypatch):
+    """
+    Documents in the same group are never neighbours, and grams above the postings cap are not scored.
+    """
+    from app.utils import search_utils
+
+    texts = [
+        "항해 당직 근무",
+        "항해 당직 교대",
+        "항해 당직 인계",
+        "기관 정비 점검",
+        "선박 복원성 계산",
+        "해상 법규 조항",
+        "전기 회로 저항",
+        "무선 통신 설비",
+    ]
+    ids = list(range(1, len(texts) + 1))
+    neighbors = search_utils.tfidf_neighbors(
+        ids, texts, 3, groups=[1, 1, 3, 4, 5, 6, 7, 8]
+    )
+    assert [qna_id for qna_id, _ in neighbors[1]] == [3]
+    assert sorted(qna_id for qna_id, _ in neighbors[3]) == [1, 2]
+    assert neighbors[4] == ()
+
+    # "항해"와 "당직"이 세 문서에 나오므로 상한이 2면 더 이상 이웃을 만들지 않는다.
+    monkeypatch.setattr(search_utils, "TFIDF_MAX_POSTINGS", 2)
+    capped = search_utils.tfidf_neighbors(ids, texts, 3)
+    assert all(not capped[qna_id] for qna_id in (1, 2, 3))
@@ -70,6 +70,53 @@ def test_get_one_inning_signed_200(signed_client):
     assert response_data["odapset_id"] is not None
 
 
+def test_get_one_inning_unsigned_304(client):
+    """
+    Emulate revalidating a cached inning with the ETag from a previous response.
+    """
+    response = client.get("/api/solve/", params=solve_params_successful)
+    assert response.status_code == 200
+    etag = response.headers["etag"]
+    response = client.get(
+        "/api/solve/",
+        params=solve_params_successful,
+        headers={"If-None-Match": etag},
+    )
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag
+
+
+def test_get_one_inning_signed_no_etag(signed_client):
+    """
+    Emulate a signed user sending an ETag, who must still get a new odapset_id.
+    """
+    response = signed_client.get("/api/solve/", params=solve_params_successful)
+    assert response.status_code == 200
+    assert "etag" not in response.headers
+    response = signed_client.get(
+        "/api/solve/",
+        params=solve_params_successful,
+        headers={"If-None-Match": "*"},
+    )
+    assert response.status_code == 200
+    assert response.json()["odapset_id"] is not None
+
+
+def test_get_one_inning_without_answers_200(client):
+    """
+    Emulate an exam client that asks for questions without answers and explanations.
+    """
+    response = client.get("/api/solve/", params=solve_params_successful)
+    response_without_answers = client.get(
+        "/api/solve/", params={**solve_params_successful, "answers": "false"}
+    )
+    assert response_without_answers.status_code == 200
+    qnas = response_without_answers.json()["qnas"]
+    assert all(qna["answer"] is None and qna["explanation"] is None for qna in qnas)
+    assert response_without_answers.headers["etag"] != response.headers["etag"]
+    assert len(response_without_answers.content) < len(response.content)
+
+
 def test_get_one_image_200(client):
     response = client.get(
         "/api/solve/img/항해사/D1_2021_01/D1_2021_01-pic1422.png",
@@ -96,3 +143,71 @@ def test_get_one_image_404(client):
         "/api/solve/img/항해사/D2_2021_01/D1_2021_01-pic1422.png",
     )
     assert response.status_code == 404
+
+
+def test_get_one_image_304(client):
+    """
+    Emulate a browser revalidating a cached diagram with its ETag.
+    """
+    image_url = "/api/solve/img/항해사/D1_2021_01/D1_2021_01-pic1422.png"
+    response = client.get(image_url)
+    assert response.status_code == 200
+    assert "immutable" in response.headers["cache-control"]
+    etag = response.headers["etag"]
+    response = client.get(image_url, headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag
+
+
+def test_get_one_image_206(client):
+    """
+    Emulate a partial download of a diagram.
+    """
+    response = client.get(
+        "/api/solve/img/항해사/D1_2021_01/D1_2021_01-pic1422.png",
+        headers={"Range": "bytes=0-7"},
+    )
+    assert response.status_code == 206
+    assert response.content == b"\x89PNG\r\n\x1a\n"
+
+
+def test_get_one_image_webp_200(client, tmp_path, monkeypatch):
+    """
+    Emulate a phone asking for a downsized WebP variant of a diagram.
+    """
+    from app.core.config import settings
+
+    monkeypatch.setattr(settings, "IMAGE_VARIANT_CACHE_PATH", tmp_path)
+    response = client.get(
+        "/api/solve/img/항해사/D1_2021_01/D1_2021_01-pic1422.png",
+        params={"width": 300, "format": "webp"},
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "image/webp"
+    assert response.content.startswith(b"RIFF")
+    assert len(list(tmp_path.glob("*-320-webp.webp"))) == 1
+
+
+def test_get_inning_image_bundle_200(client):
+    """
+    Emulate downloading every diagram of an inning in one request.
+    """
+    import io, zipfile
+
+    qnas = client.get("/api/solve/", params=solve_params_successful).json()["qnas"]
+    img_paths = {path for qna in qnas for path in qna["imgPaths"] or []}
+    response = client.get(f"/api/solve/img_bundle/{qnas[0]['gichulset_id']}")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/zip"
+    with zipfile.ZipFile(io.BytesIO(response.content)) as zf:
+        assert set(zf.namelist()) == img_paths
+    response = client.get(
+        f"/api/solve/img_bundle/{qnas[0]['gichulset_id']}",
+        headers={"If-None-Match": response.headers["etag"]},
+    )
+    assert response.status_code == 304
+
+
+def test_get_inning_image_bundle_404(client):
+    response = client.get("/api/solve/img_bundle/0")  # fail
+    assert response.status_code == 404